@@ -0,0 +1,294 @@
+# app/colors.py
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ---- Named color table --------------------------------------------------------
+# CSS4 named colors plus the menswear shades the model tends to use
+# ("charcoal", "camel", "burgundy", ...). Keys are lowercase with no spaces.
+
+_NAMED_HEX: Dict[str, str] = {
+    # CSS4
+    "aliceblue": "#F0F8FF", "antiquewhite": "#FAEBD7", "aqua": "#00FFFF", "aquamarine": "#7FFFD4",
+    "azure": "#F0FFFF", "beige": "#F5F5DC", "bisque": "#FFE4C4", "black": "#000000",
+    "blanchedalmond": "#FFEBCD", "blue": "#0000FF", "blueviolet": "#8A2BE2", "brown": "#A52A2A",
+    "burlywood": "#DEB887", "cadetblue": "#5F9EA0", "chartreuse": "#7FFF00", "chocolate": "#D2691E",
+    "coral": "#FF7F50", "cornflowerblue": "#6495ED", "cornsilk": "#FFF8DC", "crimson": "#DC143C",
+    "cyan": "#00FFFF", "darkblue": "#00008B", "darkcyan": "#008B8B", "darkgoldenrod": "#B8860B",
+    "darkgray": "#A9A9A9", "darkgreen": "#006400", "darkgrey": "#A9A9A9", "darkkhaki": "#BDB76B",
+    "darkmagenta": "#8B008B", "darkolivegreen": "#556B2F", "darkorange": "#FF8C00", "darkorchid": "#9932CC",
+    "darkred": "#8B0000", "darksalmon": "#E9967A", "darkseagreen": "#8FBC8F", "darkslateblue": "#483D8B",
+    "darkslategray": "#2F4F4F", "darkslategrey": "#2F4F4F", "darkturquoise": "#00CED1", "darkviolet": "#9400D3",
+    "deeppink": "#FF1493", "deepskyblue": "#00BFFF", "dimgray": "#696969", "dimgrey": "#696969",
+    "dodgerblue": "#1E90FF", "firebrick": "#B22222", "floralwhite": "#FFFAF0", "forestgreen": "#228B22",
+    "fuchsia": "#FF00FF", "gainsboro": "#DCDCDC", "ghostwhite": "#F8F8FF", "gold": "#FFD700",
+    "goldenrod": "#DAA520", "gray": "#808080", "grey": "#808080", "green": "#008000",
+    "greenyellow": "#ADFF2F", "honeydew": "#F0FFF0", "hotpink": "#FF69B4", "indianred": "#CD5C5C",
+    "indigo": "#4B0082", "ivory": "#FFFFF0", "khaki": "#F0E68C", "lavender": "#E6E6FA",
+    "lavenderblush": "#FFF0F5", "lawngreen": "#7CFC00", "lemonchiffon": "#FFFACD", "lightblue": "#ADD8E6",
+    "lightcoral": "#F08080", "lightcyan": "#E0FFFF", "lightgoldenrodyellow": "#FAFAD2", "lightgray": "#D3D3D3",
+    "lightgreen": "#90EE90", "lightgrey": "#D3D3D3", "lightpink": "#FFB6C1", "lightsalmon": "#FFA07A",
+    "lightseagreen": "#20B2AA", "lightskyblue": "#87CEFA", "lightslategray": "#778899", "lightslategrey": "#778899",
+    "lightsteelblue": "#B0C4DE", "lightyellow": "#FFFFE0", "lime": "#00FF00", "limegreen": "#32CD32",
+    "linen": "#FAF0E6", "magenta": "#FF00FF", "maroon": "#800000", "mediumaquamarine": "#66CDAA",
+    "mediumblue": "#0000CD", "mediumorchid": "#BA55D3", "mediumpurple": "#9370DB", "mediumseagreen": "#3CB371",
+    "mediumslateblue": "#7B68EE", "mediumspringgreen": "#00FA9A", "mediumturquoise": "#48D1CC",
+    "mediumvioletred": "#C71585", "midnightblue": "#191970", "mintcream": "#F5FFFA", "mistyrose": "#FFE4E1",
+    "moccasin": "#FFE4B5", "navajowhite": "#FFDEAD", "navy": "#000080", "oldlace": "#FDF5E6",
+    "olive": "#808000", "olivedrab": "#6B8E23", "orange": "#FFA500", "orangered": "#FF4500",
+    "orchid": "#DA70D6", "palegoldenrod": "#EEE8AA", "palegreen": "#98FB98", "paleturquoise": "#AFEEEE",
+    "palevioletred": "#DB7093", "papayawhip": "#FFEFD5", "peachpuff": "#FFDAB9", "peru": "#CD853F",
+    "pink": "#FFC0CB", "plum": "#DDA0DD", "powderblue": "#B0E0E6", "purple": "#800080",
+    "rebeccapurple": "#663399", "red": "#FF0000", "rosybrown": "#BC8F8F", "royalblue": "#4169E1",
+    "saddlebrown": "#8B4513", "salmon": "#FA8072", "sandybrown": "#F4A460", "seagreen": "#2E8B57",
+    "seashell": "#FFF5EE", "sienna": "#A0522D", "silver": "#C0C0C0", "skyblue": "#87CEEB",
+    "slateblue": "#6A5ACD", "slategray": "#708090", "slategrey": "#708090", "snow": "#FFFAFA",
+    "springgreen": "#00FF7F", "steelblue": "#4682B4", "tan": "#D2B48C", "teal": "#008080",
+    "thistle": "#D8BFD8", "tomato": "#FF6347", "turquoise": "#40E0D0", "violet": "#EE82EE",
+    "wheat": "#F5DEB3", "white": "#FFFFFF", "whitesmoke": "#F5F5F5", "yellow": "#FFFF00",
+    "yellowgreen": "#9ACD32",
+    # Menswear / fashion shades
+    "charcoal": "#36454F", "heathergray": "#9A9A9A", "heathergrey": "#9A9A9A", "stone": "#928E85",
+    "taupe": "#483C32", "greige": "#B7AFA3", "oatmeal": "#D8CBB3", "ecru": "#C2B280",
+    "cream": "#FFFDD0", "offwhite": "#FAF9F6", "bone": "#E3DAC9", "sand": "#C2B280",
+    "camel": "#C19A6B", "cognac": "#9A463D", "chestnut": "#954535", "mocha": "#6F4E37",
+    "espresso": "#4B3621", "chocolatebrown": "#3F2A14", "rust": "#B7410E", "terracotta": "#E2725B",
+    "brick": "#8B3A2B", "burgundy": "#800020", "oxblood": "#4A0000", "wine": "#722F37",
+    "mustard": "#FFDB58", "ochre": "#CC7722", "sage": "#9CAF88", "mint": "#98FF98",
+    "hunter": "#355E3B", "huntergreen": "#355E3B", "bottlegreen": "#006A4E", "armygreen": "#4B5320",
+    "olivegreen": "#708238", "denim": "#1560BD", "indigodenim": "#243A5E", "rawdenim": "#1B2A41",
+    "navyblue": "#1F2A44", "cobalt": "#0047AB", "babyblue": "#89CFF0", "slate": "#708090",
+    "mauve": "#E0B0FF", "blush": "#DE5D83", "dustyrose": "#DCAE96", "lilac": "#C8A2C8",
+}
+
+# Modifier words that don't name a color on their own ("light wash", "deep")
+_SKIP_WORDS = {"wash", "washed", "deep", "pale", "soft", "muted", "dusty", "faded", "rich", "pure", "heather"}
+
+_HEX_RE = re.compile(r"^#?([0-9a-f]{3}|[0-9a-f]{6})$", re.I)
+_RGB_RE = re.compile(r"^rgba?\(\s*(\d{1,3})\s*,\s*(\d{1,3})\s*,\s*(\d{1,3})", re.I)
+
+_TABLE_NAMES: List[str] = list(_NAMED_HEX)
+_TABLE_RGB = np.array(
+    [[int(h[i:i + 2], 16) for i in (1, 3, 5)] for h in _NAMED_HEX.values()], dtype=np.float64
+)
+
+
+# ---- Parsing ------------------------------------------------------------------
+
+def _hex_to_rgb(h: str) -> Tuple[int, int, int]:
+    h = h.lstrip("#")
+    if len(h) == 3:
+        h = "".join(c * 2 for c in h)
+    return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
+
+
+@lru_cache(maxsize=4096)
+def parse_color(value: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Parse "#1F2A44", "1f2a44", "#abc", "rgb(31, 42, 68)" or a color name
+    ("navy", "Navy Blue", "dark olive") to an (r, g, b) tuple; None if unknown.
+    """
+    s = (value or "").strip().lower()
+    if not s:
+        return None
+
+    m = _HEX_RE.match(s)
+    if m:
+        return _hex_to_rgb(m.group(1))
+
+    m = _RGB_RE.match(s)
+    if m:
+        r, g, b = (min(int(x), 255) for x in m.groups())
+        return r, g, b
+
+    words = re.findall(r"[a-z]+", s)
+    joined = "".join(words)
+    if joined in _NAMED_HEX:
+        return _hex_to_rgb(_NAMED_HEX[joined])
+    # "navy blue chinos" → try adjacent pairs, then single words, left to right
+    for i in range(len(words) - 1):
+        pair = words[i] + words[i + 1]
+        if pair in _NAMED_HEX:
+            return _hex_to_rgb(_NAMED_HEX[pair])
+    for w in words:
+        if w not in _SKIP_WORDS and w in _NAMED_HEX:
+            return _hex_to_rgb(_NAMED_HEX[w])
+    return None
+
+
+def to_hex(rgb: Sequence[int]) -> str:
+    return "#{:02X}{:02X}{:02X}".format(*(int(c) for c in rgb))
+
+
+# ---- Vectorized color math ----------------------------------------------------
+
+def _rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """sRGB (…, 3) in 0..255 → CIE Lab (D65), same leading shape."""
+    c = rgb / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    m = np.array([[0.4124, 0.3576, 0.1805],
+                  [0.2126, 0.7152, 0.0722],
+                  [0.0193, 0.1192, 0.9505]])
+    xyz = (c @ m.T) / np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    L = 116 * f[..., 1] - 16
+    a = 500 * (f[..., 0] - f[..., 1])
+    b = 200 * (f[..., 1] - f[..., 2])
+    return np.stack([L, a, b], axis=-1)
+
+
+def _rgb_to_hsv(rgb: np.ndarray) -> np.ndarray:
+    """sRGB (…, 3) in 0..255 → HSV with hue in degrees, s/v in 0..1."""
+    c = rgb / 255.0
+    mx = c.max(axis=-1)
+    mn = c.min(axis=-1)
+    delta = mx - mn
+    safe = np.where(delta == 0, 1.0, delta)
+    r, g, b = c[..., 0], c[..., 1], c[..., 2]
+    h = np.where(mx == r, ((g - b) / safe) % 6,
+                 np.where(mx == g, (b - r) / safe + 2, (r - g) / safe + 4))
+    h = np.where(delta == 0, 0.0, h * 60.0)
+    s = np.where(mx == 0, 0.0, delta / np.where(mx == 0, 1.0, mx))
+    return np.stack([h, s, mx], axis=-1)
+
+
+_TABLE_LAB = _rgb_to_lab(_TABLE_RGB)
+
+# Hue distances (degrees) that read as intentional: monochrome/analogous,
+# triadic, split-complementary and complementary.
+_HARMONY_TEMPLATES = np.array([0.0, 30.0, 120.0, 150.0, 180.0])
+_HARMONY_SIGMA = 15.0
+
+
+def nearest_names(rgb: np.ndarray) -> np.ndarray:
+    """(…, 3) sRGB → array of nearest table names by Lab distance."""
+    lab = _rgb_to_lab(np.asarray(rgb, dtype=np.float64))
+    d = ((lab[..., None, :] - _TABLE_LAB) ** 2).sum(axis=-1)
+    return np.asarray(_TABLE_NAMES, dtype=object)[d.argmin(axis=-1)]
+
+
+def harmony_scores(rgb: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Score palettes in one pass.
+    rgb: (N, K, 3) padded colors; mask: (N, K) marks real entries.
+    Returns (N,) scores in 0..1 (NaN where a palette has no colors).
+    """
+    hsv = _rgb_to_hsv(rgb)
+    hue, sat, val = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    # Greys, near-blacks and near-whites go with anything
+    neutral = (sat < 0.2) | (val < 0.2) | ((val > 0.9) & (sat < 0.3))
+
+    d = np.abs(hue[:, :, None] - hue[:, None, :])
+    d = np.minimum(d, 360.0 - d)
+    fit = np.exp(-((d[..., None] - _HARMONY_TEMPLATES) ** 2) / (2 * _HARMONY_SIGMA ** 2)).max(axis=-1)
+    pair_score = np.where(neutral[:, :, None] | neutral[:, None, :], 1.0, fit)
+
+    k = mask.shape[1]
+    upper = np.triu(np.ones((k, k), dtype=bool), 1)
+    pairs = mask[:, :, None] & mask[:, None, :] & upper
+    n_pairs = pairs.sum(axis=(1, 2))
+    hue_score = np.where(n_pairs > 0, (pair_score * pairs).sum(axis=(1, 2)) / np.maximum(n_pairs, 1), 1.0)
+
+    # More than three competing chromatic colors reads as busy
+    chromatic = (mask & ~neutral).sum(axis=1)
+    busy = np.clip(1.0 - 0.15 * (chromatic - 3), 0.4, 1.0)
+
+    # Some light/dark contrast helps an outfit read well
+    L = _rgb_to_lab(rgb)[..., 0]
+    n = mask.sum(axis=1)
+    mean_L = (L * mask).sum(axis=1) / np.maximum(n, 1)
+    std_L = np.sqrt((((L - mean_L[:, None]) ** 2) * mask).sum(axis=1) / np.maximum(n, 1))
+    contrast = np.clip(std_L / 25.0, 0.0, 1.0)
+
+    score = (0.85 * hue_score + 0.15 * np.where(n > 1, contrast, 1.0)) * busy
+    return np.where(n > 0, score, np.nan)
+
+
+# ---- Outfit-level helpers -----------------------------------------------------
+
+def _pack(color_lists: Sequence[Sequence[Tuple[int, int, int]]]) -> Tuple[np.ndarray, np.ndarray]:
+    k = max((len(c) for c in color_lists), default=0) or 1
+    rgb = np.zeros((len(color_lists), k, 3), dtype=np.float64)
+    mask = np.zeros((len(color_lists), k), dtype=bool)
+    for i, colors in enumerate(color_lists):
+        if colors:
+            rgb[i, :len(colors)] = colors
+            mask[i, :len(colors)] = True
+    return rgb, mask
+
+
+def annotate_outfits(outfits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Normalize `palette` / `items_colors` to "#RRGGBB" and add `palette_names`
+    and `harmony` to every outfit dict, in place. Works on a whole response or
+    any batch of outfits; the color math runs once for the batch. Entries
+    that aren't dicts are left untouched.
+    """
+    dicts = [o for o in outfits if isinstance(o, dict)]
+    if not dicts:
+        return outfits
+
+    per_outfit: List[List[Tuple[int, int, int]]] = []
+    palette_rgb: List[List[Tuple[int, int, int]]] = []
+    for o in dicts:
+        raw_palette = o.get("palette") or []
+        if isinstance(raw_palette, str):
+            raw_palette = [raw_palette]
+        parsed: List[Tuple[int, int, int]] = []
+        if isinstance(raw_palette, list):
+            # Normalize in place; entries we can't parse ("earth tones") stay as given
+            palette: List[Any] = []
+            for p in raw_palette:
+                c = parse_color(str(p))
+                if c is not None:
+                    parsed.append(c)
+                palette.append(p if c is None else to_hex(c))
+            if palette:
+                o["palette"] = palette
+
+        items_colors = o.get("items_colors")
+        item_rgb: List[Tuple[int, int, int]] = []
+        if isinstance(items_colors, dict):
+            for slot, value in list(items_colors.items()):
+                c = parse_color(str(value))
+                if c is not None:
+                    items_colors[slot] = to_hex(c)
+                    item_rgb.append(c)
+
+        palette_rgb.append(parsed)
+        # Harmony considers every distinct color the outfit actually uses
+        per_outfit.append(list(dict.fromkeys(parsed + item_rgb)))
+
+    rgb, mask = _pack(per_outfit)
+    scores = harmony_scores(rgb, mask)
+
+    prgb, pmask = _pack(palette_rgb)
+    names = nearest_names(prgb)
+
+    for i, o in enumerate(dicts):
+        o["palette_names"] = [str(n) for n in names[i][pmask[i]]]
+        o["harmony"] = None if np.isnan(scores[i]) else round(float(scores[i]), 3)
+    return outfits
+
+
+def rank_outfits(
+    outfits: List[Dict[str, Any]],
+    *,
+    by_harmony: bool = False,
+    min_harmony: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Annotate, then optionally drop outfits below `min_harmony` and sort best-first."""
+    annotate_outfits(outfits)
+
+    def harmony(o: Any) -> Optional[float]:
+        return o.get("harmony") if isinstance(o, dict) else None
+
+    if min_harmony is not None:
+        outfits = [o for o in outfits if harmony(o) is None or harmony(o) >= min_harmony]
+    if by_harmony:
+        outfits = sorted(outfits, key=lambda o: harmony(o) if harmony(o) is not None else -1.0, reverse=True)
+    return outfits
@@ -0,0 +1,27 @@
+# app/env.py
+"""Typed readers for the env knobs documented at the top of each module."""
+from __future__ import annotations
+
+import os
+
+
+def env_int(key: str, default: int) -> int:
+    try:
+        return int(os.getenv(key, "") or default)
+    except ValueError:
+        return default
+
+
+def env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key, "") or default)
+    except ValueError:
+        return default
+
+
+def env_flag(key: str, default: bool = False) -> bool:
+    """Off-by-default switch: anything but unset/"0"/"false"/"no" turns it on."""
+    value = os.getenv(key)
+    if value is None:
+        return default
+    return value.lower() not in ("0", "false", "no")
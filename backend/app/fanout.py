@@ -0,0 +1,121 @@
+# app/fanout.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from app.env import env_flag, env_float, env_int
+from app.models.schema import SuggestRequest
+from app.prompts import _clamp_count
+
+# ---- Configuration knobs (env names) -----------------------------------------
+#
+#   SUGGEST_FANOUT            "true" to fan out by default (per-request output.fanout wins)
+#   SUGGEST_FANOUT_CHUNK      outfits per parallel generation (default 2)
+#   SUGGEST_FANOUT_SPARE      extra outfits requested to survive de-duplication (default 1)
+#   SUGGEST_FANOUT_OVERLAP    item-overlap ratio at which two outfits count as duplicates (default 0.6)
+
+
+FANOUT_DEFAULT = env_flag("SUGGEST_FANOUT")
+FANOUT_CHUNK = max(1, env_int("SUGGEST_FANOUT_CHUNK", 2))
+FANOUT_SPARE = max(0, env_int("SUGGEST_FANOUT_SPARE", 1))
+FANOUT_OVERLAP = env_float("SUGGEST_FANOUT_OVERLAP", 0.6)
+
+# One hint per slice so parallel generations explore different directions
+DIVERSITY_HINTS = (
+    "lead with the most classic, safe interpretation of the brief.",
+    "lean into texture and layering; vary fabrics from the other looks.",
+    "go slightly more relaxed/casual than the obvious choice.",
+    "go slightly dressier/sharper than the obvious choice.",
+    "build around a contrasting accent color within the palette guide.",
+    "favor a tonal or monochrome approach.",
+)
+
+_ITEM_SLOTS = ("top", "bottom", "shoes", "outerwear", "layer")
+
+ChunkFn = Callable[[SuggestRequest, int, Optional[str]], Awaitable[Dict[str, Any]]]
+
+
+def fanout_enabled(body: SuggestRequest) -> bool:
+    flag = body.output.fanout
+    return FANOUT_DEFAULT if flag is None else bool(flag)
+
+
+def plan_chunks(count: int, chunk: int = FANOUT_CHUNK, spare: int = FANOUT_SPARE) -> List[int]:
+    """Split `count` (+ spare) into near-equal slices of at most `chunk` outfits."""
+    total = count + spare
+    n = -(-total // chunk)
+    base, rem = divmod(total, n)
+    return [base + (1 if i < rem else 0) for i in range(n)]
+
+
+def _signature(outfit: Dict[str, Any]) -> FrozenSet[str]:
+    items = outfit.get("items") or {}
+    values = [items.get(k) for k in _ITEM_SLOTS] + list(items.get("accessories") or [])
+    return frozenset(" ".join(re.findall(r"[a-z0-9]+", str(v).lower())) for v in values if v)
+
+
+def dedupe_outfits(outfits: List[Dict[str, Any]], threshold: float = FANOUT_OVERLAP) -> List[Dict[str, Any]]:
+    """Drop outfits whose item set overlaps (Jaccard) an earlier one by >= threshold."""
+    kept: List[Dict[str, Any]] = []
+    sigs: List[FrozenSet[str]] = []
+    for o in outfits:
+        sig = _signature(o)
+        if sig and any(len(sig & s) / len(sig | s) >= threshold for s in sigs):
+            continue
+        kept.append(o)
+        sigs.append(sig)
+    return kept
+
+
+async def _run_slices(
+    body: SuggestRequest, generate_chunk: ChunkFn, sizes: List[int], hint_offset: int = 0
+) -> Tuple[List[List[Dict[str, Any]]], List[BaseException]]:
+    results = await asyncio.gather(
+        *(
+            generate_chunk(body, n, DIVERSITY_HINTS[(hint_offset + i) % len(DIVERSITY_HINTS)])
+            for i, n in enumerate(sizes)
+        ),
+        return_exceptions=True,
+    )
+    slices: List[List[Dict[str, Any]]] = []
+    errors: List[BaseException] = []
+    for r in results:
+        if isinstance(r, BaseException):
+            errors.append(r)
+        elif isinstance(r.get("outfits"), list):
+            slices.append([o for o in r["outfits"] if isinstance(o, dict)])
+    return slices, errors
+
+
+async def fan_out(body: SuggestRequest, generate_chunk: ChunkFn) -> Dict[str, Any]:
+    """
+    Run the request as several concurrent smaller generations, merge them
+    round-robin (so each slice's best pick comes first) and drop near-duplicates.
+    If de-duplication leaves fewer than the requested count, one follow-up
+    round generates the missing number; any remaining shortfall is logged and
+    the outfits that exist are returned.
+    """
+    count = _clamp_count(body.output.count, default=4)
+    sizes = plan_chunks(count)
+    slices, errors = await _run_slices(body, generate_chunk, sizes)
+    if not slices:
+        raise errors[0] if errors else RuntimeError("fan-out produced no outfits")
+    if errors:
+        logging.warning("[fanout] %d of %d slices failed: %s", len(errors), len(sizes), errors[0])
+
+    merged = [s[i] for i in range(max(map(len, slices))) for s in slices if i < len(s)]
+    outfits = dedupe_outfits(merged)
+
+    missing = count - len(outfits)
+    if missing > 0:
+        # Top up with fresh directions; serial after the first round, but only on shortfall
+        extra_sizes = plan_chunks(missing)
+        extra, _ = await _run_slices(body, generate_chunk, extra_sizes, hint_offset=len(sizes))
+        outfits = dedupe_outfits(outfits + [o for s in extra for o in s])
+        if len(outfits) < count:
+            logging.warning("[fanout] returning %d of %d requested outfits after de-duplication", len(outfits), count)
+
+    return {"outfits": outfits[:count]}
@@ -3,6 +3,8 @@ import os
 from typing import Optional
 from openai import OpenAI
 
+from app.transport import get_transport
+
 DALLE_ENABLED = os.getenv("DALLE_ENABLE", "false").lower() not in ("0","false","no")
 IMAGE_MODEL = os.getenv("OPENAI_IMAGE_MODEL", "gpt-image-1")
 IMAGE_SIZE  = os.getenv("OPENAI_IMAGE_SIZE", "1024x1024")  # 1024x1024 | 1024x1536 | 1536x1024 | auto
@@ -22,11 +24,19 @@ def generate_icon(item_name: str) -> Optional[str]:
             "Centered, solid WHITE background (no transparency). "
             "Dark outline, no text, no watermark."
         )
-        r = _client().images.generate(model=IMAGE_MODEL, prompt=prompt, size=IMAGE_SIZE, n=1)
-        data = (r.data or [])
-        if not data or not data[0].b64_json:
+        request = {"model": IMAGE_MODEL, "prompt": prompt, "size": IMAGE_SIZE}
+
+        def send() -> Optional[str]:
+            r = _client().images.generate(model=IMAGE_MODEL, prompt=prompt, size=IMAGE_SIZE, n=1)
+            data = (r.data or [])
+            if not data or not data[0].b64_json:
+                return None
+            return data[0].b64_json
+
+        b64 = get_transport().roundtrip("image", request, send)
+        if not b64:
             return None
-        return f"data:image/png;base64,{data[0].b64_json}"
+        return f"data:image/png;base64,{b64}"
     except Exception as e:
         print(f"[dalle] icon generation failed for '{item_name}': {e}")
         return None
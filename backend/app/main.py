@@ -1,22 +1,30 @@
 # app/main.py
 from __future__ import annotations
 
+import asyncio
 import json
 import logging,os
 import re
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.models.schema import (
     SuggestRequest, SuggestResponse,
     FeedbackRequest, FeedbackResponse,
+    PrefetchRequest,
 )
 # ✅ Prompt builders live outside main
-from app.prompts import build_prompt, build_feedback_prompt
+from app.prompts import build_prompt, build_feedback_prompt, _clamp_count, request_key
 from app.openai_client import chat_json
+from app.colors import rank_outfits
+from app.speculation import Speculator
+from app.fanout import FANOUT_CHUNK, fan_out, fanout_enabled
+from app.outfit_cache import OutfitCache
+from app.env import env_flag, env_int
+from app.warming import CacheWarmer, RequestLog
 
 # --- simple domain guard: allow clothing/outfit/event-related ---
 CLOTHING_WORDS = (
@@ -37,7 +45,19 @@ SYS = (
     "Do not include extra prose outside JSON."
 )
 def create_app() -> FastAPI:
-    app = FastAPI(title="Outfit API (minimal)", version="1.0")
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        logging.basicConfig(level=logging.INFO)
+        logging.info("[startup] FastAPI app starting")
+        logging.info("PORT=%s", os.getenv("PORT"))
+        logging.info("OPENAI_API_KEY=%s", "set" if os.getenv("OPENAI_API_KEY") else "missing")
+        warm_task = asyncio.create_task(app.state.warmer.run_forever()) if app.state.warmer.enabled else None
+        yield
+        if warm_task is not None:
+            warm_task.cancel()
+        logging.info("[shutdown] FastAPI app shutting down")
+
+    app = FastAPI(title="Outfit API (minimal)", version="1.0", lifespan=lifespan)
 
     # CORS
     origins = os.getenv(
@@ -84,28 +104,102 @@ def create_app() -> FastAPI:
             detail={"error": "bad_model_json", "raw": str(obj)[:400]},
         )
 
-    @asynccontextmanager
-    async def lifespan(app: FastAPI):
-        logging.basicConfig(level=logging.INFO)
-        logging.info("[startup] FastAPI app starting")
-        logging.info("PORT=%s", os.getenv("PORT"))
-        logging.info("OPENAI_API_KEY=%s", "set" if os.getenv("OPENAI_API_KEY") else "missing")
-        yield
-        logging.info("[shutdown] FastAPI app shutting down")
 
+    async def _generate_chunk(body: SuggestRequest, count: Optional[int] = None, hint: Optional[str] = None) -> Dict[str, Any]:
+        user_prompt = build_prompt(body, count=count, diversity_hint=hint)
+        # chat_json blocks on the network; keep the event loop free
+        raw = await asyncio.to_thread(chat_json, SYS, user_prompt)  # returns dict (ideally), but we’ll be defensive
+        return _coerce_json(raw)
+
+    async def _generate(body: SuggestRequest) -> Dict[str, Any]:
+        if fanout_enabled(body) and _clamp_count(body.output.count) > FANOUT_CHUNK:
+            data = await fan_out(body, _generate_chunk)
+        else:
+            data = await _generate_chunk(body)
+        if isinstance(data.get("outfits"), list):
+            data["outfits"] = rank_outfits(
+                data["outfits"],
+                by_harmony=body.output.rank_by_harmony,
+                min_harmony=body.output.min_harmony,
+            )
+        return data
+
+    speculator = Speculator(_generate)
+    app.state.speculator = speculator
+
+    # Response cache: off unless enabled or warmed (identical requests would
+    # otherwise always get identical outfits back)
+    cache_enabled = env_flag("RESPONSE_CACHE_ENABLE") or env_flag("CACHE_WARM_ENABLE")
+    cache = OutfitCache(
+        max_entries=env_int("RESPONSE_CACHE_SIZE", 2048),
+        ttl_s=env_int("RESPONSE_CACHE_TTL_S", 12 * 3600),
+    )
+    request_log = RequestLog()
+    warmer = CacheWarmer(_generate, cache, request_log)
+    app.state.cache = cache
+    app.state.warmer = warmer
 
     @app.post("/suggest")
     async def suggest(body: SuggestRequest):
+        if warmer.enabled:
+            # Only the warmer reads the log; write it off the event loop
+            await asyncio.to_thread(request_log.append, body)
+        key = request_key(body)
         try:
-            user_prompt = build_prompt(body)
-            raw = chat_json(SYS, user_prompt)  # returns dict (ideally), but we’ll be defensive
-            data = _coerce_json(raw)
-            return data
+            if cache_enabled:
+                cached = cache.get_dicts(key)
+                if cached is not None:
+                    return {"outfits": cached}
+
+            data = None
+            # Attach to a speculative generation started by /suggest/prefetch
+            task = speculator.claim(body)
+            if task is not None:
+                try:
+                    data = await asyncio.shield(task)
+                except Exception as e:
+                    logging.warning("[suggest] speculation failed, generating fresh: %s", e)
+            if data is None:
+                data = await _generate(body)
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail={"error": "openai_error", "message": str(e)})
 
+        outfits = data.get("outfits")
+        if cache_enabled and isinstance(outfits, list) and outfits and all(isinstance(o, dict) for o in outfits):
+            # The outfits are already paid for; a cache failure must not cost the response
+            try:
+                cache.put(key, outfits)
+            except Exception as e:
+                logging.warning("[suggest] could not cache response: %s", e)
+        return data
+
+    @app.post("/suggest/prefetch")
+    async def suggest_prefetch(partial: PrefetchRequest):
+        body = partial.to_suggest_request()
+        if body is None:
+            return {"status": "incomplete"}
+        status, key = speculator.start(body, session_id=partial.session_id)
+        return {"status": status, "key": key}
+
+    @app.get("/suggest/prefetch/stats")
+    async def suggest_prefetch_stats():
+        return speculator.stats()
+
+    @app.get("/cache/stats")
+    async def cache_stats():
+        return {"cache_enabled": cache_enabled, **warmer.stats()}
+
+    @app.post("/cache/warm")
+    async def cache_warm(x_warm_token: Optional[str] = Header(default=None)):
+        token = os.getenv("CACHE_WARM_TOKEN")
+        if not token or x_warm_token != token:
+            raise HTTPException(status_code=403, detail={"error": "forbidden", "message": "CACHE_WARM_TOKEN required"})
+        if not cache_enabled:
+            raise HTTPException(status_code=400, detail={"error": "cache_disabled", "message": "Set RESPONSE_CACHE_ENABLE or CACHE_WARM_ENABLE."})
+        return await warmer.run_once()
+
     @app.post("/feedback", response_model=FeedbackResponse)
     async def feedback(req: FeedbackRequest):
         # Domain guard
@@ -147,6 +241,7 @@ def create_app() -> FastAPI:
             }
             final.append(outfit)
 
+        final = rank_outfits(final, by_harmony=req.output.rank_by_harmony, min_harmony=req.output.min_harmony)
         return {"outfits": final}
 
     return app
@@ -43,6 +43,9 @@ class Constraints(BaseModel):
 class OutputOpts(BaseModel):
     count: int = 4                 # default to 4 outfits as requested
     include_notes: bool = True
+    rank_by_harmony: bool = False  # sort outfits best palette harmony first
+    min_harmony: Optional[float] = None  # drop outfits scoring below this (0..1)
+    fanout: Optional[bool] = None  # split into parallel generations (None → SUGGEST_FANOUT env)
 
 class SuggestRequest(BaseModel):
     occasion: str
@@ -55,6 +58,35 @@ class SuggestRequest(BaseModel):
     body_type: Optional[str] = None  # keep string for flexibility with client
     season: Optional[Season] = None  # new
 
+class PrefetchRequest(BaseModel):
+    """Partially filled SuggestRequest sent while the user is still editing the form."""
+    occasion: Optional[str] = None
+    weather: Optional[Weather] = None
+    style: Optional[Style] = None
+    special_items: SpecialItems = Field(default_factory=SpecialItems)
+    constraints: Constraints = Field(default_factory=Constraints)
+    output: OutputOpts = Field(default_factory=OutputOpts)
+    age: Optional[int] = None
+    body_type: Optional[str] = None
+    season: Optional[Season] = None
+    session_id: Optional[str] = None  # lets a newer prefetch supersede the previous one
+
+    def to_suggest_request(self) -> Optional[SuggestRequest]:
+        # Need at least occasion + temperature to build a meaningful prompt
+        if not (self.occasion or "").strip() or self.weather is None:
+            return None
+        return SuggestRequest(
+            occasion=self.occasion,
+            weather=self.weather,
+            style=self.style or Style(),
+            special_items=self.special_items,
+            constraints=self.constraints,
+            output=self.output,
+            age=self.age,
+            body_type=self.body_type,
+            season=self.season,
+        )
+
 # -------------------------
 # Response models (align with frontend)
 # -------------------------
@@ -100,6 +132,9 @@ class Outfit(BaseModel):
 
     # Overall palette suggestion
     palette: Optional[List[str]] = None
+    # Server-side color analysis (see app/colors.py)
+    palette_names: Optional[List[str]] = None
+    harmony: Optional[float] = None
 
     @field_validator("palette")
     @classmethod
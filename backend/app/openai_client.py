@@ -14,6 +14,8 @@ except Exception:  # pragma: no cover
 
 from openai import OpenAI
 
+from app.transport import get_transport
+
 # ---- Configuration knobs (env names) -----------------------------------------
 
 # Name (or full ARN) of the AWS Secrets Manager secret containing a JSON object:
@@ -158,19 +160,33 @@ def _client() -> OpenAI:
 
 # ✅ Flexible: system + user prompts
 def chat_json(system_prompt: str, user_prompt: str, *, model: Optional[str] = None) -> dict:
-    client = _client()
-    mdl = model or _get_secret("OPENAI_MODEL") or "gpt-4o-mini"
-
-    resp = client.chat.completions.create(
-        model=mdl,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=0.6,
-    )
-
-    content = resp.choices[0].message.content.strip()
+    transport = get_transport()
+    # The model is resolved inside send() (Secrets Manager on live/record) and
+    # stored with the response, so it is not part of the cassette key and a
+    # replay never needs the secret. An explicit `model` is part of the request.
+    request: Dict[str, Any] = {
+        "system": system_prompt,
+        "user": user_prompt,
+        "temperature": 0.6,
+    }
+    if model:
+        request["model"] = model
+
+    def send() -> Dict[str, str]:
+        mdl = model or _get_secret("OPENAI_MODEL") or "gpt-4o-mini"
+        resp = _client().chat.completions.create(
+            model=mdl,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=request["temperature"],
+        )
+        return {"model": mdl, "content": resp.choices[0].message.content.strip()}
+
+    # live / record / replay (see app/transport.py)
+    reply = transport.roundtrip("chat", request, send)
+    content = reply["content"] if isinstance(reply, dict) else reply
     try:
         return json.loads(content)
     except json.JSONDecodeError:
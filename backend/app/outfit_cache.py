@@ -0,0 +1,287 @@
+# app/outfit_cache.py
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from app.models.schema import Outfit, OutfitItems
+
+# Order of the single-valued item slots inside CompactOutfit.refs
+_ITEM_SLOTS = ("top", "bottom", "shoes", "outerwear", "layer")
+
+
+class StringPool:
+    """
+    Interns the short, highly repeated strings of cached outfits
+    ("navy chinos", "#1F2A44", "top") as small integer ids. Id 0 means None.
+    """
+
+    __slots__ = ("_ids", "_strings", "_lock")
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._strings: List[Optional[str]] = [None]
+        self._lock = threading.Lock()
+
+    def intern(self, s: Optional[str]) -> int:
+        if s is None:
+            return 0
+        i = self._ids.get(s)
+        if i is None:
+            with self._lock:
+                i = self._ids.get(s)
+                if i is None:
+                    i = len(self._strings)
+                    self._strings.append(s)
+                    self._ids[s] = i
+        return i
+
+    def get(self, i: int) -> Optional[str]:
+        return self._strings[i]
+
+    def __len__(self) -> int:
+        return len(self._strings) - 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+            del self._strings[1:]
+
+
+def _text(value: Any) -> Optional[str]:
+    """Model output is free-form: keep strings, stringify scalars, drop the rest."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    return None
+
+
+def _texts(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [t for t in map(_text, value) if t is not None]
+
+
+class CompactOutfit:
+    """
+    Array-backed record for one stored outfit.
+
+    `refs` is a flat array of pool ids:
+        [top, bottom, shoes, outerwear, layer,
+         n_acc, acc..., n_pal, pal..., n_names, names..., n_colors, (slot, color)...]
+    Free text (why/notes/fit_notes) is kept as plain str since it rarely repeats;
+    icons/icons_img are kept as-is in `extras` when present.
+    """
+
+    __slots__ = ("refs", "why", "notes", "fit_notes", "harmony", "extras")
+
+    def __init__(
+        self,
+        refs: array,
+        why: Optional[str] = None,
+        notes: Optional[str] = None,
+        fit_notes: Optional[str] = None,
+        harmony: Optional[float] = None,
+        extras: Optional[Dict[str, Any]] = None,
+    ):
+        self.refs = refs
+        self.why = why
+        self.notes = notes
+        self.fit_notes = fit_notes
+        self.harmony = harmony
+        self.extras = extras
+
+    @classmethod
+    def pack(cls, outfit: Union[Outfit, Dict[str, Any]], pool: StringPool) -> "CompactOutfit":
+        o = outfit.model_dump() if isinstance(outfit, Outfit) else outfit
+        items = o.get("items") if isinstance(o.get("items"), dict) else {}
+        intern = pool.intern
+
+        refs = array("I", (intern(_text(items.get(k))) for k in _ITEM_SLOTS))
+        for seq in (items.get("accessories"), o.get("palette"), o.get("palette_names")):
+            seq = _texts(seq)
+            refs.append(len(seq))
+            refs.extend(intern(s) for s in seq)
+        raw_colors = o.get("items_colors") if isinstance(o.get("items_colors"), dict) else {}
+        colors = [(_text(k), _text(v)) for k, v in raw_colors.items()]
+        colors = [(k, v) for k, v in colors if k is not None and v is not None]
+        refs.append(len(colors))
+        for k, v in colors:
+            refs.append(intern(k))
+            refs.append(intern(v))
+
+        extras = {k: o[k] for k in ("icons", "icons_img") if o.get(k)} or None
+        return cls(refs, o.get("why"), o.get("notes"), o.get("fit_notes"), o.get("harmony"), extras)
+
+    def to_dict(self, pool: StringPool) -> Dict[str, Any]:
+        get = pool.get
+        refs = self.refs
+        items: Dict[str, Any] = {k: get(refs[i]) for i, k in enumerate(_ITEM_SLOTS)}
+
+        pos = len(_ITEM_SLOTS)
+        lists: List[List[str]] = []
+        for _ in range(3):
+            n = refs[pos]
+            lists.append([get(r) for r in refs[pos + 1:pos + 1 + n]])
+            pos += 1 + n
+        accessories, palette, palette_names = lists
+
+        n = refs[pos]
+        colors = {get(refs[pos + 1 + 2 * j]): get(refs[pos + 2 + 2 * j]) for j in range(n)}
+
+        items["accessories"] = accessories
+        out: Dict[str, Any] = {
+            "items": items,
+            "items_colors": colors or None,
+            "why": self.why,
+            "notes": self.notes,
+            "fit_notes": self.fit_notes,
+            "palette": palette or None,
+            "palette_names": palette_names or None,
+            "harmony": self.harmony,
+        }
+        if self.extras:
+            out.update(self.extras)
+        return out
+
+    def inflate(self, pool: StringPool) -> Outfit:
+        d = self.to_dict(pool)
+        d["items"] = OutfitItems(**d["items"])
+        return Outfit(**d)
+
+
+class OutfitCache:
+    """
+    Thread-safe LRU of generated outfit lists keyed by request key.
+    Entries are stored as tuples of CompactOutfit sharing one StringPool and
+    only inflated back to `Outfit` when read. Entries put with warmed=True
+    (precomputed by app/warming.py) are tracked separately in stats(), and
+    put(ttl_s=...) overrides the cache-wide TTL for one entry.
+
+    Evicted entries leave their strings behind in the pool, so once the pool
+    outgrows twice its size after the last rebuild (plus `pool_slack`) it is
+    rebuilt from the live entries only. Readers keep the pool they looked up
+    with, so a rebuild never invalidates a read in progress.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_s: Optional[float] = None, pool_slack: int = 1024):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.pool_slack = pool_slack
+        self.pool = StringPool()
+        self._pool_live = 0
+        # key -> (stored_at, outfits, warmed, expires_at or None)
+        self._data: "OrderedDict[str, Tuple[float, Tuple[CompactOutfit, ...], bool, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.warm_hits = 0
+        self.pool_rebuilds = 0
+
+    def _rebuild_pool(self) -> None:
+        # Caller holds self._lock
+        old, new = self.pool, StringPool()
+        for key, (stored, packed, warmed, expires) in self._data.items():
+            repacked = tuple(CompactOutfit.pack(c.to_dict(old), new) for c in packed)
+            self._data[key] = (stored, repacked, warmed, expires)
+        self.pool = new
+        self._pool_live = len(new)
+        self.pool_rebuilds += 1
+
+    def put(
+        self,
+        key: str,
+        outfits: Iterable[Union[Outfit, Dict[str, Any]]],
+        *,
+        warmed: bool = False,
+        ttl_s: Optional[float] = None,
+    ) -> None:
+        outfits = list(outfits)
+        ttl = ttl_s if ttl_s is not None else self.ttl_s
+        with self._lock:
+            now = time.monotonic()
+            packed = tuple(CompactOutfit.pack(o, self.pool) for o in outfits)
+            self._data[key] = (now, packed, warmed, None if ttl is None else now + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            if len(self.pool) > 2 * self._pool_live + self.pool_slack:
+                self._rebuild_pool()
+
+    def _get_packed(self, key: str) -> Optional[Tuple[Tuple[CompactOutfit, ...], StringPool]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[3] is not None and time.monotonic() > entry[3]:
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            if entry[2]:
+                self.warm_hits += 1
+            return entry[1], self.pool
+
+    def get(self, key: str) -> Optional[List[Outfit]]:
+        found = self._get_packed(key)
+        if found is None:
+            return None
+        packed, pool = found
+        return [c.inflate(pool) for c in packed]
+
+    def get_dicts(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Like get(), but skips model construction for JSON responses."""
+        found = self._get_packed(key)
+        if found is None:
+            return None
+        packed, pool = found
+        return [c.to_dict(pool) for c in packed]
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def remaining_ttl(self, key: str) -> Optional[float]:
+        """Seconds until `key` expires (inf if it never does), or None if absent/expired."""
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[3] is None:
+            return float("inf")
+        left = entry[3] - time.monotonic()
+        return left if left > 0 else None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            # Fresh pool rather than clear(): readers may still hold the old one
+            self.pool = StringPool()
+            self._pool_live = 0
+            self.hits = self.misses = self.warm_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self._lock:
+            warm_entries = sum(1 for e in self._data.values() if e[2])
+        return {
+            "entries": len(self._data),
+            "warm_entries": warm_entries,
+            "interned_strings": len(self.pool),
+            "pool_rebuilds": self.pool_rebuilds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "warm_hits": self.warm_hits,
+            "warm_hit_ratio": round(self.warm_hits / lookups, 4) if lookups else None,
+        }
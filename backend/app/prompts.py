@@ -1,7 +1,10 @@
 # app/prompts.py
 from __future__ import annotations
 
-from typing import List
+import hashlib
+import json
+from typing import Any, Dict, List
+from app.env import env_flag, env_int
 from app.models.schema import SuggestRequest, FeedbackRequest
 
 
@@ -37,10 +40,109 @@ def _clamp_count(n: int | None, default: int = 4) -> int:
     return max(1, min(v, 6))  # keep 1..6 to avoid extreme responses
 
 
-def build_prompt(body: SuggestRequest) -> str:
-    """Prompt for first-time outfit generation."""
+# Width (°F) of the temperature buckets requests are matched on; 0 keeps the
+# exact reading. Bucketing only pays off when responses are shared (response
+# cache, warming or speculation), so it defaults to 5 then and to 0 otherwise.
+#   SUGGEST_TEMP_BUCKET_F
+TEMP_BUCKET_F = max(0, env_int(
+    "SUGGEST_TEMP_BUCKET_F",
+    5 if any(env_flag(k) for k in ("RESPONSE_CACHE_ENABLE", "CACHE_WARM_ENABLE", "SPECULATION_ENABLE")) else 0,
+))
+
+
+def temp_bucket(temp: float) -> float:
+    if not TEMP_BUCKET_F:
+        return float(temp)
+    return int(float(temp) // TEMP_BUCKET_F * TEMP_BUCKET_F)
+
+
+def temp_range(temp: float) -> str:
+    """Temperature as it appears in the prompt: 61 → "60–64" when bucketed, else "61.0"."""
+    lo = temp_bucket(temp)
+    if not TEMP_BUCKET_F:
+        return str(lo)
+    return f"{lo}–{lo + TEMP_BUCKET_F - 1}"
+
+
+def _norm(v: Any) -> Any:
+    if isinstance(v, str):
+        v = " ".join(v.split()).lower()
+        return v or None
+    return v
+
+
+def canonical_request(body: SuggestRequest) -> Dict[str, Any]:
+    """
+    Canonical shape of a SuggestRequest: only the fields build_prompt reads,
+    with case/whitespace folded, avoid-list sorted and count clamped, so
+    requests that produce the same prompt compare equal. When TEMP_BUCKET_F is
+    set, temperature is floored to its buckets (the 65°F outerwear cut-off is
+    a bucket edge) and build_prompt states the bucket's range rather than the
+    exact reading, so responses shared across a bucket match their prompt text.
+    """
+    avoid = sorted({a for a in (_norm(x) for x in (body.constraints.avoid or [])) if a})
+    return {
+        "occasion": _norm(body.occasion),
+        "season": body.season or "all",
+        "temp": temp_bucket(body.weather.temp),
+        "rain": bool(body.weather.rain),
+        "vibe": _norm(body.style.vibe) or "neat",
+        "fit": _norm(body.style.fit) or "regular",
+        "palette": _norm(body.style.palette) or "neutrals",
+        "centerpiece": _norm(body.special_items.centerpiece),
+        "must_include": _norm(body.special_items.must_include),
+        "avoid": avoid,
+        "count": _clamp_count(body.output.count, default=4),
+        "include_notes": bool(body.output.include_notes),
+        "rank_by_harmony": bool(body.output.rank_by_harmony),
+        "fanout": body.output.fanout,
+        "min_harmony": body.output.min_harmony,
+        "age": body.age,
+        "body_type": _norm(body.body_type) or "regular",
+    }
+
+
+def request_from_canonical(c: Dict[str, Any]) -> SuggestRequest:
+    """Inverse of canonical_request (temperature becomes the bucket's lower edge)."""
+    return SuggestRequest(
+        occasion=c["occasion"] or "",
+        season=c["season"],
+        weather={"temp": c["temp"], "rain": c["rain"]},
+        style={"vibe": c["vibe"], "fit": c["fit"], "palette": c["palette"]},
+        special_items={"centerpiece": c["centerpiece"], "must_include": c["must_include"]},
+        constraints={"avoid": c["avoid"] or None},
+        output={
+            "count": c["count"],
+            "include_notes": c["include_notes"],
+            "rank_by_harmony": c["rank_by_harmony"],
+            "min_harmony": c["min_harmony"],
+            "fanout": c["fanout"],
+        },
+        age=c["age"],
+        body_type=c["body_type"],
+    )
+
+
+def request_key(body: SuggestRequest) -> str:
+    """Stable hash of canonical_request(body)."""
+    blob = json.dumps(canonical_request(body), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def build_prompt(
+    body: SuggestRequest,
+    *,
+    count: int | None = None,
+    diversity_hint: str | None = None,
+) -> str:
+    """
+    Prompt for first-time outfit generation.
+    `count` overrides body.output.count and `diversity_hint` steers one
+    slice of a fanned-out request (see app/fanout.py).
+    """
     occ = body.occasion
-    temp = float(body.weather.temp)
+    # Bucket range when responses are shared per bucket, else the exact reading
+    temp = temp_range(body.weather.temp)
     rain = bool(getattr(body.weather, "rain", False))
 
     vibe = (getattr(body.style, "vibe", None) or "neat")
@@ -53,8 +155,9 @@ def build_prompt(body: SuggestRequest) -> str:
     avoid_list = getattr(body.constraints, "avoid", None) or []
     avoid_str = ", ".join(avoid_list) if avoid_list else "none"
 
-    count = _clamp_count(getattr(body.output, "count", None), default=4)
+    count = _clamp_count(count if count is not None else getattr(body.output, "count", None), default=4)
     include_notes = bool(getattr(body.output, "include_notes", True))
+    diversity = f"\n- Diversity: {diversity_hint}" if diversity_hint else ""
 
     age = getattr(body, "age", None)
     age_str = f"{age}" if age is not None else "adult"
@@ -74,7 +177,7 @@ Audience & context:
 - Special items: centerpiece="{centerpiece}", must_include="{must_include}".
 - Avoid: {avoid_str}.
 - Number of outfits to return: {count}.
-- Notes included: {include_notes}.
+- Notes included: {include_notes}.{diversity}
 
 Hard rules:
 - Outerwear: MUST be provided when (temp < 65°F) OR (rain == true) OR the context is dressy; else set "outerwear" to null.
@@ -0,0 +1,175 @@
+# app/speculation.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from app.env import env_flag, env_int
+from app.models.schema import SuggestRequest
+from app.prompts import _clamp_count, request_key
+
+# ---- Configuration knobs (env names) -----------------------------------------
+#
+#   SPECULATION_ENABLE        "true" to accept /suggest/prefetch (default off)
+#   SPECULATION_MAX_INFLIGHT  concurrent speculative generations (default 4)
+#   SPECULATION_BUDGET        outfits that may be generated speculatively per window (default 24)
+#   SPECULATION_WINDOW_S      budget window in seconds (default 60)
+#   SPECULATION_TTL_S         unclaimed speculations expire after this (default 120)
+
+
+@dataclass
+class _Speculation:
+    task: "asyncio.Task[Dict[str, Any]]"
+    cost: int                      # outfits requested; proxy for model spend
+    started: float = field(default_factory=time.monotonic)
+    session_id: Optional[str] = None
+
+
+class Speculator:
+    """
+    Runs `generate(body)` ahead of time for requests the client is likely to
+    submit, and hands the in-flight (or finished) task to the matching /suggest.
+    "Matching" means the same prompts.request_key, so with 5°F buckets (the
+    default while speculation is on) a prefetch at 61°F serves a submit at
+    64°F: both fall in the 60–64°F bucket, which is what the prompt states
+    (see prompts.TEMP_BUCKET_F / build_prompt).
+
+    Cancelling an unclaimed speculation stops anyone waiting on it, but the
+    model call already running in its worker thread still completes, so its
+    cost is counted as wasted spend.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[SuggestRequest], Awaitable[Dict[str, Any]]],
+        *,
+        enabled: Optional[bool] = None,
+        max_inflight: Optional[int] = None,
+        budget: Optional[int] = None,
+        window_s: Optional[int] = None,
+        ttl_s: Optional[int] = None,
+    ):
+        self._generate = generate
+        self.enabled = (
+            enabled if enabled is not None
+            else env_flag("SPECULATION_ENABLE")
+        )
+        self.max_inflight = max_inflight or env_int("SPECULATION_MAX_INFLIGHT", 4)
+        self.budget = budget or env_int("SPECULATION_BUDGET", 24)
+        self.window_s = window_s or env_int("SPECULATION_WINDOW_S", 60)
+        self.ttl_s = ttl_s or env_int("SPECULATION_TTL_S", 120)
+
+        self._entries: Dict[str, _Speculation] = {}
+        self._by_session: Dict[str, str] = {}
+        self._spend: Deque[Tuple[float, int]] = deque()
+
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.wasted_outfits = 0
+        self.spent_outfits = 0
+        self.rejected_budget = 0
+
+    # ---- internals -----------------------------------------------------------
+
+    def _discard(self, key: str) -> None:
+        spec = self._entries.pop(key, None)
+        if spec is None:
+            return
+        if spec.session_id and self._by_session.get(spec.session_id) == key:
+            del self._by_session[spec.session_id]
+        if not spec.task.done():
+            spec.task.cancel()
+        self.wasted += 1
+        self.wasted_outfits += spec.cost
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, s in self._entries.items() if now - s.started > self.ttl_s]:
+            self._discard(key)
+        while self._spend and now - self._spend[0][0] > self.window_s:
+            self._spend.popleft()
+
+    def _inflight(self) -> int:
+        return sum(1 for s in self._entries.values() if not s.task.done())
+
+    # ---- public surface ------------------------------------------------------
+
+    def start(self, body: SuggestRequest, session_id: Optional[str] = None) -> Tuple[str, str]:
+        """Start speculating on `body`; returns (status, key)."""
+        key = request_key(body)
+        if not self.enabled:
+            return "disabled", key
+
+        self._sweep()
+        if key in self._entries:
+            return "exists", key
+
+        # A newer form state from the same client replaces its previous guess,
+        # but only once the new one is allowed to start
+        previous = self._by_session.get(session_id) if session_id else None
+        inflight = self._inflight()
+        if previous is not None and not self._entries[previous].task.done():
+            inflight -= 1
+
+        cost = _clamp_count(body.output.count, default=4)
+        window_spend = sum(c for _, c in self._spend)
+        if inflight >= self.max_inflight or window_spend + cost > self.budget:
+            self.rejected_budget += 1
+            return "over_budget", key
+
+        if previous is not None:
+            self._discard(previous)
+
+        task = asyncio.create_task(self._generate(body))
+        task.add_done_callback(_log_failure)
+        self._entries[key] = _Speculation(task=task, cost=cost, session_id=session_id)
+        if session_id:
+            self._by_session[session_id] = key
+        self._spend.append((time.monotonic(), cost))
+        self.started += 1
+        self.spent_outfits += cost
+        return "started", key
+
+    def claim(self, body: SuggestRequest) -> "Optional[asyncio.Task[Dict[str, Any]]]":
+        """Hand over the speculation matching `body`, if any (counts hit/miss)."""
+        if not self.enabled:
+            return None
+        self._sweep()
+        key = request_key(body)
+        spec = self._entries.pop(key, None)
+        if spec is None or spec.task.cancelled():
+            self.misses += 1
+            return None
+        if spec.session_id and self._by_session.get(spec.session_id) == key:
+            del self._by_session[spec.session_id]
+        self.hits += 1
+        return spec.task
+
+    def stats(self) -> Dict[str, Any]:
+        self._sweep()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "started": self.started,
+            "inflight": self._inflight(),
+            "pending": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "wasted": self.wasted,
+            "rejected_budget": self.rejected_budget,
+            "spent_outfits": self.spent_outfits,
+            "wasted_outfits": self.wasted_outfits,
+            "wasted_spend_ratio": round(self.wasted_outfits / self.spent_outfits, 4) if self.spent_outfits else None,
+        }
+
+
+def _log_failure(task: "asyncio.Task[Any]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logging.warning("[speculation] speculative generation failed: %s", task.exception())
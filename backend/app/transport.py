@@ -0,0 +1,195 @@
+# app/transport.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+# ---- Configuration knobs (env names) -----------------------------------------
+#
+#   OPENAI_TRANSPORT       live (default) | record | replay
+#   OPENAI_CASSETTE_PATH   SQLite cassette file (default: cassettes/openai.sqlite3)
+#   OPENAI_REPLAY_LATENCY  scale applied to the recorded latency on replay
+#                          (0 = instant, 1 = original timing, 0.5 = half, ...)
+
+DEFAULT_CASSETTE_PATH = os.path.join("cassettes", "openai.sqlite3")
+
+
+class CassetteMiss(RuntimeError):
+    pass
+
+
+# ---- Keys ---------------------------------------------------------------------
+
+def _normalize(value: Any) -> Any:
+    """Collapse whitespace in every string so cosmetic prompt edits hash the same."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> bytes:
+    """16-byte digest of the normalized request (kind + model + prompts + params)."""
+    blob = json.dumps([kind, _normalize(request)], sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).digest()
+
+
+# ---- Cassette store -----------------------------------------------------------
+
+class CassetteStore:
+    """
+    Indexed on-disk store of request/response pairs.
+    One SQLite row per interaction, keyed by the 16-byte request digest; the
+    request/response JSON is zlib-compressed so tens of thousands of
+    interactions stay in a small single file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS interactions ("
+            " key BLOB PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " latency_ms INTEGER NOT NULL,"
+            " recorded_at INTEGER NOT NULL,"
+            " payload BLOB NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._db.commit()
+
+    def put(self, kind: str, request: Dict[str, Any], response: Any, latency_s: float) -> None:
+        payload = zlib.compress(
+            json.dumps({"request": request, "response": response}, separators=(",", ":")).encode("utf-8"),
+            level=9,
+        )
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO interactions VALUES (?, ?, ?, ?, ?)",
+                (request_key(kind, request), kind, int(latency_s * 1000), int(time.time()), payload),
+            )
+            self._db.commit()
+
+    def get(self, kind: str, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return {"request", "response", "latency_s"} or None if not recorded."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT latency_ms, payload FROM interactions WHERE key = ?",
+                (request_key(kind, request),),
+            ).fetchone()
+        if row is None:
+            return None
+        data = json.loads(zlib.decompress(row[1]))
+        data["latency_s"] = row[0] / 1000.0
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT kind, COUNT(*), SUM(LENGTH(payload)) FROM interactions GROUP BY kind"
+            ).fetchall()
+        return {kind: {"count": n, "bytes": size or 0} for kind, n, size in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+# ---- Transports ---------------------------------------------------------------
+
+class Transport:
+    """
+    Sits between a client helper and the network.
+    `send` performs the live call and returns a JSON-serializable response.
+    """
+
+    mode = "live"
+
+    def roundtrip(self, kind: str, request: Dict[str, Any], send: Callable[[], Any]) -> Any:
+        return send()
+
+
+class LiveTransport(Transport):
+    pass
+
+
+class RecordTransport(Transport):
+    mode = "record"
+
+    def __init__(self, store: CassetteStore):
+        self.store = store
+
+    def roundtrip(self, kind: str, request: Dict[str, Any], send: Callable[[], Any]) -> Any:
+        t0 = time.perf_counter()
+        response = send()
+        self.store.put(kind, request, response, time.perf_counter() - t0)
+        return response
+
+
+class ReplayTransport(Transport):
+    mode = "replay"
+
+    def __init__(self, store: CassetteStore, latency_scale: float = 0.0):
+        self.store = store
+        self.latency_scale = max(0.0, latency_scale)
+
+    def roundtrip(self, kind: str, request: Dict[str, Any], send: Callable[[], Any]) -> Any:
+        hit = self.store.get(kind, request)
+        if hit is None:
+            raise CassetteMiss(f"No recorded {kind} interaction for this request in {self.store.path}")
+        if self.latency_scale:
+            time.sleep(hit["latency_s"] * self.latency_scale)
+        return hit["response"]
+
+
+# ---- Public surface -----------------------------------------------------------
+
+_transport: Optional[Transport] = None
+_transport_lock = threading.Lock()
+
+
+def _from_env() -> Transport:
+    mode = (os.getenv("OPENAI_TRANSPORT") or "live").strip().lower()
+    if mode == "live":
+        return LiveTransport()
+
+    store = CassetteStore(os.getenv("OPENAI_CASSETTE_PATH") or DEFAULT_CASSETTE_PATH)
+    if mode == "record":
+        return RecordTransport(store)
+    if mode == "replay":
+        try:
+            scale = float(os.getenv("OPENAI_REPLAY_LATENCY", "0") or 0)
+        except ValueError:
+            scale = 0.0
+        return ReplayTransport(store, latency_scale=scale)
+    raise RuntimeError(f"Unknown OPENAI_TRANSPORT={mode!r} (expected live, record or replay)")
+
+
+def get_transport() -> Transport:
+    """Process-wide transport, built from env on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = _from_env()
+    return _transport
+
+
+def set_transport(transport: Optional[Transport]) -> None:
+    """Override the process-wide transport (None re-reads env on next use)."""
+    global _transport
+    with _transport_lock:
+        _transport = transport
@@ -0,0 +1,290 @@
+# app/warming.py
+"""
+Off-peak cache warming for the most requested SuggestRequest shapes.
+
+While warming is enabled, /suggest appends the canonical shape of each
+request (prompts.canonical_request: occasion × season × temperature bucket ×
+style ...) to a rotating JSONL log (SUGGEST_LOG_PATH). The warmer mines that
+log for the most frequent shapes and precomputes their responses into the
+response cache during off-peak hours, within a spend and concurrency budget.
+Warmed entries live until the first pass of the next off-peak window.
+
+    python -m app.warming --top 20                     # report top shapes from the log
+    python -m app.warming --url http://localhost:8000  # ask a running server to warm now
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.env import env_flag, env_int
+from app.models.schema import SuggestRequest
+from app.outfit_cache import OutfitCache
+from app.prompts import _clamp_count, canonical_request, request_from_canonical, request_key, temp_range
+
+# ---- Configuration knobs (env names) -----------------------------------------
+#
+#   SUGGEST_LOG_PATH          request log mined for popular shapes (default logs/suggest_requests.jsonl)
+#   SUGGEST_LOG_MAX_BYTES     rotate the log to <path>.1 past this size (default 20 MB)
+#   CACHE_WARM_ENABLE         "true" to run the in-app scheduler (default off)
+#   CACHE_WARM_HOURS          off-peak local hours as "start-end" (default 2-6, i.e. 02:00–05:59)
+#   CACHE_WARM_INTERVAL_S     minimum seconds between warming passes (default 3600)
+#   CACHE_WARM_LOOKBACK_S     how far back to mine the log (default 7 days)
+#   CACHE_WARM_TOP            number of shapes to keep warm (default 25)
+#   CACHE_WARM_BUDGET         max outfits generated per pass (default 120)
+#   CACHE_WARM_CONCURRENCY    parallel generations per pass (default 2)
+#   CACHE_WARM_TOKEN          shared secret required by POST /cache/warm
+
+DEFAULT_LOG_PATH = os.path.join("logs", "suggest_requests.jsonl")
+
+
+def _parse_hours(spec: str) -> Tuple[int, int]:
+    try:
+        start, end = (int(x) for x in spec.split("-", 1))
+        return start % 24, end % 24
+    except ValueError:
+        return 2, 6
+
+
+# ---- Request log --------------------------------------------------------------
+
+class RequestLog:
+    """
+    Append-only JSONL log of canonical /suggest request shapes (one line per
+    request), rotated to `<path>.1` once it grows past max_bytes.
+    append() does blocking file I/O; call it via asyncio.to_thread.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = path or os.getenv("SUGGEST_LOG_PATH") or DEFAULT_LOG_PATH
+        self.max_bytes = max_bytes or env_int("SUGGEST_LOG_MAX_BYTES", 20 * 1024 * 1024)
+        self._lock = threading.Lock()
+
+    def append(self, body: SuggestRequest) -> None:
+        line = json.dumps({"ts": int(time.time()), "shape": canonical_request(body)}, separators=(",", ":"))
+        try:
+            with self._lock:
+                parent = os.path.dirname(self.path)
+                if parent:
+                    os.makedirs(parent, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+                    size = f.tell()
+                if size > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+        except OSError as e:
+            logging.warning("[warming] could not append to %s: %s", self.path, e)
+
+    def top_shapes(self, *, lookback_s: int, limit: int) -> List[Tuple[SuggestRequest, int]]:
+        """Most frequent canonical shapes since now - lookback_s, as requests with their counts."""
+        cutoff = time.time() - lookback_s
+        counts: Counter = Counter()
+        shapes: Dict[str, Dict[str, Any]] = {}
+        for path in (self.path + ".1", self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    shape = rec.get("shape")
+                    if rec.get("ts", 0) < cutoff or not isinstance(shape, dict):
+                        continue
+                    blob = json.dumps(shape, sort_keys=True)
+                    counts[blob] += 1
+                    shapes[blob] = shape
+
+        out: List[Tuple[SuggestRequest, int]] = []
+        for blob, n in counts.most_common():
+            try:
+                body = request_from_canonical(shapes[blob])
+            except Exception:
+                continue  # written by an older canonical form
+            out.append((body, n))
+            if len(out) >= limit:
+                break
+        return out
+
+
+# ---- Warmer -------------------------------------------------------------------
+
+class CacheWarmer:
+    """Precomputes responses for popular request shapes into an OutfitCache."""
+
+    def __init__(
+        self,
+        generate: Callable[[SuggestRequest], Awaitable[Dict[str, Any]]],
+        cache: OutfitCache,
+        log: RequestLog,
+    ):
+        self._generate = generate
+        self.cache = cache
+        self.log = log
+        self.enabled = env_flag("CACHE_WARM_ENABLE")
+        self.hours = _parse_hours(os.getenv("CACHE_WARM_HOURS", "2-6"))
+        self.interval_s = env_int("CACHE_WARM_INTERVAL_S", 3600)
+        self.lookback_s = env_int("CACHE_WARM_LOOKBACK_S", 7 * 24 * 3600)
+        self.top = env_int("CACHE_WARM_TOP", 25)
+        self.budget = env_int("CACHE_WARM_BUDGET", 120)
+        self.concurrency = max(1, env_int("CACHE_WARM_CONCURRENCY", 2))
+
+        self.last_run: Optional[float] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._running = asyncio.Lock()
+
+    def is_off_peak(self, hour: Optional[int] = None) -> bool:
+        hour = time.localtime().tm_hour if hour is None else hour
+        start, end = self.hours
+        return start <= hour < end if start <= end else hour >= start or hour < end
+
+    def next_window_start(self, now: Optional[float] = None) -> float:
+        """Epoch time at which the next off-peak window opens (strictly after now)."""
+        now = time.time() if now is None else now
+        lt = time.localtime(now)
+        t = time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday, self.hours[0], 0, 0, 0, 0, -1))
+        while t <= now:
+            t += 24 * 3600
+        return t
+
+    def warm_ttl_s(self, now: Optional[float] = None) -> float:
+        """
+        TTL for entries warmed now: through the next window's first pass (with
+        one interval of slack), so they stay warm across the day's peaks.
+        """
+        now = time.time() if now is None else now
+        return self.next_window_start(now) - now + 2 * self.interval_s
+
+    def _needs_refresh(self, key: str) -> bool:
+        # Same horizon as warm_ttl_s: refresh anything that won't outlive the
+        # first pass of the next window
+        left = self.cache.remaining_ttl(key)
+        if left is None:
+            return True
+        now = time.time()
+        return left < self.next_window_start(now) - now + self.interval_s
+
+    async def run_once(self) -> Dict[str, Any]:
+        """One warming pass; returns a report (also kept in last_report)."""
+        async with self._running:
+            t0 = time.perf_counter()
+            shapes = await asyncio.to_thread(self.log.top_shapes, lookback_s=self.lookback_s, limit=self.top)
+
+            planned: List[SuggestRequest] = []
+            spend = 0
+            skipped_budget = 0
+            for body, _ in shapes:
+                if not self._needs_refresh(request_key(body)):
+                    continue
+                cost = _clamp_count(body.output.count, default=4)
+                if spend + cost > self.budget:
+                    skipped_budget += 1
+                    continue
+                planned.append(body)
+                spend += cost
+
+            sem = asyncio.Semaphore(self.concurrency)
+            failed = 0
+
+            async def warm(body: SuggestRequest) -> None:
+                nonlocal failed
+                async with sem:
+                    try:
+                        data = await self._generate(body)
+                        outfits = data.get("outfits")
+                    except Exception as e:
+                        failed += 1
+                        logging.warning("[warming] generation failed for %s: %s", canonical_request(body), e)
+                        return
+                    if not (isinstance(outfits, list) and outfits and all(isinstance(o, dict) for o in outfits)):
+                        failed += 1
+                        return
+                    try:
+                        self.cache.put(request_key(body), outfits, warmed=True, ttl_s=self.warm_ttl_s())
+                    except Exception as e:
+                        failed += 1
+                        logging.warning("[warming] could not cache %s: %s", canonical_request(body), e)
+
+            await asyncio.gather(*(warm(b) for b in planned))
+
+            self.last_run = time.time()
+            self.last_report = {
+                "shapes": len(shapes),
+                "already_warm": len(shapes) - len(planned) - skipped_budget,
+                "warmed": len(planned) - failed,
+                "failed": failed,
+                "skipped_budget": skipped_budget,
+                "spent_outfits": spend,
+                "seconds": round(time.perf_counter() - t0, 2),
+            }
+            logging.info("[warming] pass finished: %s", self.last_report)
+            return self.last_report
+
+    async def run_forever(self, poll_s: int = 60) -> None:
+        """Scheduler loop: run a pass when off-peak and the interval has elapsed."""
+        while True:
+            try:
+                due = self.last_run is None or time.time() - self.last_run >= self.interval_s
+                if due and self.is_off_peak():
+                    await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning("[warming] pass failed: %s", e)
+            await asyncio.sleep(poll_s)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "scheduler_enabled": self.enabled,
+            "off_peak_hours": "{}-{}".format(*self.hours),
+            "last_run": self.last_run,
+            "last_report": self.last_report,
+            "cache": self.cache.stats(),
+        }
+
+
+# ---- CLI ----------------------------------------------------------------------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--log", default=None, help="request log (default: SUGGEST_LOG_PATH or logs/suggest_requests.jsonl)")
+    ap.add_argument("--top", type=int, default=env_int("CACHE_WARM_TOP", 25))
+    ap.add_argument("--lookback-s", type=int, default=env_int("CACHE_WARM_LOOKBACK_S", 7 * 24 * 3600))
+    ap.add_argument("--url", default=None, help="running API base URL; triggers POST /cache/warm")
+    ap.add_argument("--token", default=os.getenv("CACHE_WARM_TOKEN"), help="CACHE_WARM_TOKEN of the server")
+    args = ap.parse_args()
+
+    if args.url:
+        from urllib.request import Request, urlopen
+
+        req = Request(
+            args.url.rstrip("/") + "/cache/warm",
+            method="POST",
+            headers={"X-Warm-Token": args.token or ""},
+        )
+        with urlopen(req) as resp:
+            print(json.dumps(json.loads(resp.read()), indent=2))
+        return
+
+    shapes = RequestLog(args.log).top_shapes(lookback_s=args.lookback_s, limit=args.top)
+    if not shapes:
+        print("No requests logged in the lookback window.")
+        return
+    total = sum(n for _, n in shapes)
+    print(f"{'count':>6}  {'share':>6}  shape")
+    for body, n in shapes:
+        c = canonical_request(body)
+        print(f"{n:>6}  {n / total:>6.1%}  {c['occasion']} | {c['season']} | {temp_range(c['temp'])}°F"
+              f"{' rain' if c['rain'] else ''} | {c['vibe']}/{c['fit']}/{c['palette']} | x{c['count']}")
+
+
+if __name__ == "__main__":
+    main()
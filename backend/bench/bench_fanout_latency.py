@@ -0,0 +1,83 @@
+# bench/bench_fanout_latency.py
+"""
+Wall-clock latency of /suggest vs outfit count, sequential vs fan-out.
+
+The model is replaced by a synthetic transport whose latency grows with the
+number of outfits requested (base + per-outfit), which is how a single
+sequential generation behaves. Requests go through the real FastAPI app.
+
+    cd backend && python -m bench.bench_fanout_latency [--base-ms 800 --per-outfit-ms 1500]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+os.environ.setdefault("OPENAI_MODEL", "bench-model")
+# Keep bench traffic out of the real request log if warming is switched on
+os.environ.setdefault("SUGGEST_LOG_PATH", os.path.join(tempfile.mkdtemp(), "suggest_requests.jsonl"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import create_app  # noqa: E402
+from app.transport import Transport, set_transport  # noqa: E402
+
+_COUNT_RE = re.compile(r"Number of outfits to return: (\d+)")
+
+
+class SyntheticTransport(Transport):
+    """Sleeps base + per_outfit * count, then returns `count` distinct outfits."""
+
+    def __init__(self, base_s: float, per_outfit_s: float):
+        self.base_s = base_s
+        self.per_outfit_s = per_outfit_s
+        self._n = 0
+
+    def roundtrip(self, kind: str, request: Dict[str, Any], send: Callable[[], Any]) -> Any:
+        count = int(_COUNT_RE.search(request["user"]).group(1))
+        time.sleep(self.base_s + self.per_outfit_s * count)
+        outfits = []
+        for _ in range(count):
+            self._n += 1
+            outfits.append({
+                "items": {"top": f"shirt {self._n}", "bottom": f"chinos {self._n}", "shoes": f"shoes {self._n}",
+                          "outerwear": None, "layer": None, "accessories": []},
+                "why": "bench", "fit_notes": "bench", "notes": "bench", "palette": ["#1F2A44", "#FFFFFF"],
+            })
+        return json.dumps({"outfits": outfits})
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--base-ms", type=float, default=800)
+    ap.add_argument("--per-outfit-ms", type=float, default=1500)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    set_transport(SyntheticTransport(args.base_ms / 1000, args.per_outfit_ms / 1000))
+
+    body = {"occasion": "office", "weather": {"temp": 60, "rain": False}, "style": {"vibe": "neat"}}
+    print(f"{'count':>5}{'sequential s':>15}{'fan-out s':>12}{'speedup':>10}")
+    with TestClient(create_app()) as client:
+        for count in range(1, 7):
+            timings = {}
+            for fanout in (False, True):
+                samples = []
+                for _ in range(args.repeat):
+                    payload = {**body, "output": {"count": count, "include_notes": True, "fanout": fanout}}
+                    t0 = time.perf_counter()
+                    r = client.post("/suggest", json=payload)
+                    samples.append(time.perf_counter() - t0)
+                    assert r.status_code == 200 and len(r.json()["outfits"]) == count, r.text
+                timings[fanout] = statistics.median(samples)
+            print(f"{count:>5}{timings[False]:>15.2f}{timings[True]:>12.2f}{timings[False] / timings[True]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
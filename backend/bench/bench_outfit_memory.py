@@ -0,0 +1,94 @@
+# bench/bench_outfit_memory.py
+"""
+Memory cost of cached outfits: plain Pydantic `Outfit` models vs the
+interned CompactOutfit records used by app.outfit_cache.
+
+    cd backend && python -m bench.bench_outfit_memory [--n 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from app.models.schema import Outfit
+from app.outfit_cache import OutfitCache
+
+TOPS = ["white oxford shirt", "navy polo", "grey crewneck sweater", "black henley", "light blue oxford shirt",
+        "striped breton tee", "white t-shirt", "olive overshirt", "cream cable-knit sweater", "chambray shirt"]
+BOTTOMS = ["navy chinos", "dark wash jeans", "grey wool trousers", "khaki chinos", "black jeans",
+           "olive chinos", "charcoal trousers", "light wash jeans"]
+SHOES = ["white leather sneakers", "brown suede loafers", "black derbies", "tan chelsea boots",
+         "brown leather boots", "navy canvas sneakers"]
+OUTER = [None, "navy blazer", "camel overcoat", "denim jacket", "olive field jacket", "black leather jacket"]
+LAYER = [None, "grey quarter-zip", "navy cardigan", "merino crewneck"]
+ACC = ["brown leather belt", "silver watch", "navy knit tie", "grey wool scarf", "tortoiseshell sunglasses",
+       "black leather belt", "canvas tote"]
+HEX = ["#1F2A44", "#FFFFFF", "#C19A6B", "#808080", "#36454F", "#F5F5DC", "#000000", "#556B2F", "#8B4513"]
+
+
+def _outfit_dict(rng: random.Random) -> Dict[str, Any]:
+    palette = rng.sample(HEX, 3)
+    return {
+        "items": {
+            "top": rng.choice(TOPS),
+            "bottom": rng.choice(BOTTOMS),
+            "shoes": rng.choice(SHOES),
+            "outerwear": rng.choice(OUTER),
+            "layer": rng.choice(LAYER),
+            "accessories": rng.sample(ACC, 2),
+        },
+        "items_colors": {"top": palette[0], "bottom": palette[1], "shoes": palette[2]},
+        "why": "Balanced neutrals that read smart without trying too hard. " * rng.randint(1, 2),
+        "fit_notes": "Choose a tapered leg and a shoulder seam that sits on the shoulder bone.",
+        "notes": "Tuck the shirt, roll sleeves twice, match belt to shoes. " * rng.randint(1, 3),
+        "palette": palette,
+    }
+
+
+def _measure(build: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return after - before
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=20000, help="number of cached outfits")
+    ap.add_argument("--per-entry", type=int, default=4, help="outfits per cached response")
+    args = ap.parse_args()
+
+    rng = random.Random(42)
+    # JSON round-trip so every record owns its strings, as it would coming off the wire
+    raw: List[str] = [json.dumps(_outfit_dict(rng)) for _ in range(args.n)]
+
+    def pydantic_models() -> List[Outfit]:
+        return [Outfit(**json.loads(s)) for s in raw]
+
+    def compact() -> OutfitCache:
+        cache = OutfitCache(max_entries=args.n)
+        for i in range(0, args.n, args.per_entry):
+            cache.put(str(i), [json.loads(s) for s in raw[i:i + args.per_entry]])
+        return cache
+
+    mb100 = 100 * 1024 * 1024
+    print(f"{'representation':<22}{'bytes/outfit':>14}{'outfits/100MB':>16}")
+    results = {}
+    for name, build in (("pydantic Outfit", pydantic_models), ("CompactOutfit", compact)):
+        per = _measure(build) / args.n
+        results[name] = per
+        print(f"{name:<22}{per:>14.0f}{mb100 / per:>16,.0f}")
+    print(f"compact is {results['pydantic Outfit'] / results['CompactOutfit']:.1f}x denser")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# tests/test_colors.py
+import math
+
+import numpy as np
+
+from app.colors import _pack, annotate_outfits, harmony_scores, nearest_names, parse_color, rank_outfits
+
+
+def test_parse_hex_and_rgb():
+    assert parse_color("#1F2A44") == (31, 42, 68)
+    assert parse_color("1f2a44") == (31, 42, 68)
+    assert parse_color("#abc") == (170, 187, 204)
+    assert parse_color("rgb(31, 42, 68)") == (31, 42, 68)
+    assert parse_color("rgba(300, 0, 0, 0.5)") == (255, 0, 0)
+
+
+def test_parse_names():
+    assert parse_color("Navy") == (0, 0, 128)
+    assert parse_color("Navy Blue") == (31, 42, 68)
+    assert parse_color("navy blue chinos") == (31, 42, 68)
+    assert parse_color("dark olive green") == parse_color("darkolivegreen")
+    assert parse_color("light wash denim") == parse_color("denim")
+
+
+def test_parse_unknown():
+    for value in ("", "   ", "earth tones", "heather", "#12345", "rgb(1, 2)"):
+        assert parse_color(value) is None
+
+
+def test_nearest_names():
+    names = nearest_names(np.array([[0, 0, 128], [31, 42, 68], [254, 254, 254]]))
+    assert list(names) == ["navy", "navyblue", "white"]
+
+
+def _scores(*palettes):
+    return harmony_scores(*_pack([[parse_color(c) for c in p] for p in palettes]))
+
+
+def test_harmony_neutrals_and_complements():
+    neutral, complementary, clash = _scores(
+        ["#000000", "#FFFFFF", "#808080"],
+        ["#0000FF", "#FFFF00", "#000000"],
+        ["#FF0000", "#FF7A00"],
+    )
+    assert neutral > 0.9
+    assert complementary > 0.9
+    # Reds and oranges ~45° apart match no harmony template
+    assert clash < complementary
+
+
+def test_harmony_busy_palette_is_penalized():
+    calm, busy = _scores(
+        ["#FF0000", "#00FF00", "#0000FF"],
+        ["#FF0000", "#00FF00", "#0000FF", "#FFFF00", "#FF00FF", "#00FFFF"],
+    )
+    assert busy < calm
+
+
+def test_harmony_empty_mask_is_nan():
+    scores = harmony_scores(np.zeros((2, 1, 3)), np.array([[False], [True]]))
+    assert math.isnan(scores[0]) and not math.isnan(scores[1])
+
+
+def test_annotate_keeps_unparsed_palette_entries():
+    outfits = [{"palette": ["navy", "heather", "earth tones"]}, {"palette": "earth tones"}, "not a dict"]
+    annotate_outfits(outfits)
+    assert outfits[0]["palette"] == ["#000080", "heather", "earth tones"]
+    assert outfits[0]["palette_names"] == ["navy"]
+    assert outfits[1]["palette"] == ["earth tones"] and outfits[1]["harmony"] is None
+    assert outfits[2] == "not a dict"
+
+
+def test_rank_filters_and_sorts():
+    outfits = [
+        {"id": "busy", "palette": ["#FF0000", "#00FF00", "#0000FF", "#FFFF00", "#FF00FF", "#00FFFF"]},
+        {"id": "neutral", "palette": ["#000000", "#FFFFFF"]},
+        {"id": "unknown", "palette": ["earth tones"]},
+    ]
+    ranked = rank_outfits([dict(o) for o in outfits], by_harmony=True)
+    assert [o["id"] for o in ranked] == ["neutral", "busy", "unknown"]
+
+    kept = rank_outfits([dict(o) for o in outfits], min_harmony=0.8)
+    # Outfits without a score are never filtered out
+    assert [o["id"] for o in kept] == ["neutral", "unknown"]
@@ -0,0 +1,60 @@
+# tests/test_fanout.py
+import asyncio
+
+from app.fanout import dedupe_outfits, fan_out, plan_chunks
+from app.models.schema import SuggestRequest
+
+
+def _outfit(top: str, bottom: str = "navy chinos", shoes: str = "white sneakers") -> dict:
+    return {"items": {"top": top, "bottom": bottom, "shoes": shoes, "accessories": []}}
+
+
+def _req(count: int) -> SuggestRequest:
+    return SuggestRequest(
+        occasion="office", weather={"temp": 60}, style={}, output={"count": count, "include_notes": True}
+    )
+
+
+def test_plan_chunks_covers_count_plus_spare():
+    for count in range(1, 7):
+        sizes = plan_chunks(count, chunk=2, spare=1)
+        assert sum(sizes) == count + 1
+        assert max(sizes) <= 2 and max(sizes) - min(sizes) <= 1
+    assert plan_chunks(6, chunk=2, spare=0) == [2, 2, 2]
+
+
+def test_dedupe_drops_near_duplicates_only():
+    a = _outfit("White Oxford shirt")
+    a_again = _outfit("white oxford  shirt")
+    b = _outfit("white oxford shirt", shoes="brown loafers")  # 2 of 4 items shared
+    c = _outfit("grey sweater", "black jeans", "black boots")
+    assert dedupe_outfits([a, a_again, b, c], threshold=0.6) == [a, b, c]
+
+
+def test_dedupe_keeps_outfits_without_items():
+    assert len(dedupe_outfits([{"items": {}}, {"items": {}}])) == 2
+
+
+def test_fan_out_tops_up_after_duplicates():
+    calls = []
+
+    async def chunk(body, n, hint):
+        calls.append(n)
+        # First round returns the same outfit from every slice
+        if len(calls) <= len(plan_chunks(4)):
+            return {"outfits": [_outfit("same shirt") for _ in range(n)]}
+        return {"outfits": [_outfit(f"shirt {len(calls)}-{i}") for i in range(n)]}
+
+    data = asyncio.run(fan_out(_req(4), chunk))
+    assert len(data["outfits"]) == 4
+    assert len(calls) > len(plan_chunks(4))
+
+
+def test_fan_out_survives_failed_slice():
+    async def chunk(body, n, hint):
+        if hint and "classic" in hint:
+            raise RuntimeError("boom")
+        return {"outfits": [_outfit(f"{hint} {i}") for i in range(n)]}
+
+    data = asyncio.run(fan_out(_req(4), chunk))
+    assert len(data["outfits"]) == 4
@@ -0,0 +1,108 @@
+# tests/test_outfit_cache.py
+from app.models.schema import Outfit
+from app.outfit_cache import CompactOutfit, OutfitCache, StringPool
+
+
+def _outfit(i: int = 0) -> dict:
+    return {
+        "items": {
+            "top": f"white oxford shirt {i}",
+            "bottom": "navy chinos",
+            "shoes": "white leather sneakers",
+            "outerwear": None,
+            "layer": "grey quarter-zip",
+            "accessories": ["brown leather belt", "silver watch"],
+        },
+        "items_colors": {"top": "#FFFFFF", "bottom": "#1F2A44"},
+        "why": "Clean contrast.",
+        "notes": "Tuck the shirt.",
+        "fit_notes": None,
+        "palette": ["#FFFFFF", "#1F2A44"],
+        "palette_names": ["white", "navyblue"],
+        "harmony": 0.9,
+    }
+
+
+def test_pack_round_trip():
+    pool = StringPool()
+    o = _outfit()
+    assert CompactOutfit.pack(o, pool).to_dict(pool) == o
+
+
+def test_pack_round_trip_from_model():
+    pool = StringPool()
+    model = Outfit(**_outfit())
+    assert CompactOutfit.pack(model, pool).inflate(pool) == model
+
+
+def test_pack_empty_outfit():
+    pool = StringPool()
+    d = CompactOutfit.pack({"items": {}}, pool).to_dict(pool)
+    assert d["items"]["accessories"] == []
+    assert d["palette"] is None and d["items_colors"] is None
+
+
+def test_string_palette_is_one_entry():
+    pool = StringPool()
+    d = CompactOutfit.pack({"items": {}, "palette": "earth tones"}, pool).to_dict(pool)
+    assert d["palette"] == ["earth tones"]
+
+
+def test_pack_tolerates_free_form_shapes():
+    pool = StringPool()
+    d = CompactOutfit.pack({
+        "items": {"top": "shirt", "bottom": {"name": "chinos"}, "shoes": 42,
+                  "accessories": [{"name": "belt"}, "watch", None]},
+        "items_colors": {"top": ["#FFFFFF"], "shoes": "#000000"},
+        "palette": {"main": "#FFFFFF"},
+    }, pool).to_dict(pool)
+    assert d["items"]["top"] == "shirt" and d["items"]["bottom"] is None and d["items"]["shoes"] == "42"
+    assert d["items"]["accessories"] == ["watch"]
+    assert d["items_colors"] == {"shoes": "#000000"}
+    assert d["palette"] is None
+
+
+def test_pack_non_dict_items():
+    pool = StringPool()
+    d = CompactOutfit.pack({"items": "white shirt, navy chinos", "why": "x"}, pool).to_dict(pool)
+    assert d["items"]["top"] is None and d["items"]["accessories"] == []
+    assert d["why"] == "x"
+
+
+def test_strings_are_shared():
+    pool = StringPool()
+    for i in range(10):
+        CompactOutfit.pack(_outfit(i), pool)
+    # 10 distinct tops + the shared strings, not 10 copies of each
+    assert len(pool) < 30
+
+
+def test_cache_lru_and_stats():
+    cache = OutfitCache(max_entries=2)
+    cache.put("a", [_outfit(1)])
+    cache.put("b", [_outfit(2)])
+    cache.put("c", [_outfit(3)])
+    assert cache.get_dicts("a") is None
+    assert cache.get_dicts("c")[0]["items"]["top"] == "white oxford shirt 3"
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_pool_is_rebuilt_after_evictions():
+    cache = OutfitCache(max_entries=2, pool_slack=64)
+    for i in range(1000):
+        cache.put(str(i), [{"items": {"top": f"top {i}", "bottom": f"bottom {i}"}}])
+    assert len(cache) == 2
+    assert len(cache.pool) <= 2 * 4 + 64 + 2
+    assert cache.stats()["pool_rebuilds"] > 0
+    assert cache.get_dicts("999")[0]["items"]["top"] == "top 999"
+
+
+def test_warm_hits_are_counted():
+    cache = OutfitCache()
+    cache.put("w", [_outfit()], warmed=True)
+    cache.put("x", [_outfit()])
+    cache.get_dicts("w")
+    cache.get_dicts("x")
+    stats = cache.stats()
+    assert stats["warm_entries"] == 1 and stats["warm_hits"] == 1
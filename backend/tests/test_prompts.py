@@ -0,0 +1,32 @@
+# tests/test_prompts.py
+from app import prompts
+from app.models.schema import SuggestRequest
+from app.prompts import build_prompt, canonical_request, request_from_canonical, request_key
+
+
+def _req(temp: float) -> SuggestRequest:
+    return SuggestRequest(occasion="Office ", weather={"temp": temp}, style={"vibe": "Neat"})
+
+
+def _weather_line(body: SuggestRequest) -> str:
+    return next(line for line in build_prompt(body).splitlines() if "Weather:" in line)
+
+
+def test_exact_temperature_without_buckets(monkeypatch):
+    monkeypatch.setattr(prompts, "TEMP_BUCKET_F", 0)
+    assert _weather_line(_req(64.9)) == "- Weather: 64.9°F, no rain."
+    assert request_key(_req(61)) != request_key(_req(64))
+
+
+def test_bucketed_temperature(monkeypatch):
+    monkeypatch.setattr(prompts, "TEMP_BUCKET_F", 5)
+    assert _weather_line(_req(64.9)) == "- Weather: 60–64°F, no rain."
+    assert request_key(_req(61)) == request_key(_req(64))
+    assert request_key(_req(64)) != request_key(_req(65))
+
+
+def test_canonical_round_trip(monkeypatch):
+    for width in (0, 5):
+        monkeypatch.setattr(prompts, "TEMP_BUCKET_F", width)
+        c = canonical_request(_req(62.5))
+        assert canonical_request(request_from_canonical(c)) == c
@@ -0,0 +1,96 @@
+# tests/test_speculation.py
+import asyncio
+
+from app.models.schema import SuggestRequest
+from app.speculation import Speculator
+
+
+def _req(occasion: str = "office", count: int = 4) -> SuggestRequest:
+    return SuggestRequest(
+        occasion=occasion,
+        weather={"temp": 60},
+        style={},
+        output={"count": count, "include_notes": True},
+    )
+
+
+async def _fake_generate(body: SuggestRequest) -> dict:
+    await asyncio.sleep(0.01)
+    return {"outfits": [{"items": {"top": body.occasion}}]}
+
+
+def test_disabled_by_default_flag():
+    async def run():
+        spec = Speculator(_fake_generate, enabled=False)
+        assert spec.start(_req())[0] == "disabled"
+        assert spec.claim(_req()) is None
+        assert spec.stats()["misses"] == 0 and spec.stats()["hit_rate"] is None
+    asyncio.run(run())
+
+
+def test_claim_hits_matching_request():
+    async def run():
+        spec = Speculator(_fake_generate, enabled=True)
+        assert spec.start(_req("Office"))[0] == "started"
+        assert spec.start(_req("office"))[0] == "exists"
+        task = spec.claim(_req(" OFFICE "))
+        assert task is not None
+        assert (await task)["outfits"][0]["items"]["top"] == "Office"
+        assert spec.claim(_req("office")) is None
+        stats = spec.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["wasted"] == 0
+    asyncio.run(run())
+
+
+def test_budget_and_inflight_limits():
+    async def run():
+        spec = Speculator(_fake_generate, enabled=True, budget=6, max_inflight=4)
+        assert spec.start(_req("a", count=4))[0] == "started"
+        assert spec.start(_req("b", count=4))[0] == "over_budget"
+        assert spec.start(_req("c", count=2))[0] == "started"
+
+        spec = Speculator(_fake_generate, enabled=True, budget=100, max_inflight=1)
+        assert spec.start(_req("a"))[0] == "started"
+        assert spec.start(_req("b"))[0] == "over_budget"
+        assert spec.stats()["rejected_budget"] == 1
+    asyncio.run(run())
+
+
+def test_unclaimed_speculations_expire_as_waste():
+    async def run():
+        spec = Speculator(_fake_generate, enabled=True, ttl_s=0.02)
+        spec.start(_req(count=3))
+        await asyncio.sleep(0.05)
+        stats = spec.stats()
+        assert stats["pending"] == 0
+        assert stats["wasted"] == 1 and stats["wasted_outfits"] == 3
+        assert spec.claim(_req(count=3)) is None
+    asyncio.run(run())
+
+
+def test_newer_prefetch_supersedes_session():
+    async def run():
+        spec = Speculator(_fake_generate, enabled=True)
+        spec.start(_req("office"), session_id="s1")
+        spec.start(_req("wedding"), session_id="s1")
+        stats = spec.stats()
+        assert stats["started"] == 2 and stats["wasted"] == 1 and stats["pending"] == 1
+        assert spec.claim(_req("office")) is None
+        assert spec.claim(_req("wedding")) is not None
+    asyncio.run(run())
+
+
+def test_rejected_prefetch_keeps_previous_guess():
+    async def run():
+        spec = Speculator(_fake_generate, enabled=True, budget=6, max_inflight=4)
+        assert spec.start(_req("office", count=4), session_id="s1")[0] == "started"
+        assert spec.start(_req("wedding", count=4), session_id="s1")[0] == "over_budget"
+        assert spec.stats()["wasted"] == 0
+        assert spec.claim(_req("office", count=4)) is not None
+
+        # Superseding frees the session's in-flight slot for its replacement
+        spec = Speculator(_fake_generate, enabled=True, budget=100, max_inflight=1)
+        spec.start(_req("office"), session_id="s1")
+        assert spec.start(_req("wedding"), session_id="s1")[0] == "started"
+        assert spec.stats()["wasted"] == 1
+    asyncio.run(run())
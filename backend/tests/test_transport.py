@@ -0,0 +1,85 @@
+# tests/test_transport.py
+import time
+
+import pytest
+
+from app import openai_client
+from app.transport import CassetteMiss, CassetteStore, RecordTransport, ReplayTransport, set_transport
+
+
+def _request(user: str = "Occasion: office") -> dict:
+    return {"system": "Return JSON.", "user": user, "temperature": 0.6}
+
+
+def test_record_then_replay(tmp_path):
+    store = CassetteStore(str(tmp_path / "c.sqlite3"))
+    calls = []
+
+    def send():
+        calls.append(1)
+        return {"model": "gpt-4o-mini", "content": '{"outfits": []}'}
+
+    assert RecordTransport(store).roundtrip("chat", _request(), send) == send()
+    replayed = ReplayTransport(store).roundtrip("chat", _request(), lambda: pytest.fail("replay must not send"))
+    assert replayed == {"model": "gpt-4o-mini", "content": '{"outfits": []}'}
+    assert store.stats()["chat"]["count"] == 1
+
+
+def test_whitespace_changes_still_hit(tmp_path):
+    store = CassetteStore(str(tmp_path / "c.sqlite3"))
+    RecordTransport(store).roundtrip("chat", _request("Occasion:  office\n"), lambda: "ok")
+    assert ReplayTransport(store).roundtrip("chat", _request(" Occasion: office"), lambda: None) == "ok"
+
+
+def test_miss_raises(tmp_path):
+    store = CassetteStore(str(tmp_path / "c.sqlite3"))
+    RecordTransport(store).roundtrip("chat", _request(), lambda: "ok")
+    with pytest.raises(CassetteMiss):
+        ReplayTransport(store).roundtrip("chat", _request("Occasion: wedding"), lambda: None)
+    with pytest.raises(CassetteMiss):
+        ReplayTransport(store).roundtrip("image", _request(), lambda: None)
+
+
+def test_replay_latency_scaling(tmp_path):
+    store = CassetteStore(str(tmp_path / "c.sqlite3"))
+    store.put("chat", _request(), "ok", latency_s=0.2)
+
+    t0 = time.perf_counter()
+    ReplayTransport(store, latency_scale=0).roundtrip("chat", _request(), lambda: None)
+    assert time.perf_counter() - t0 < 0.1
+
+    t0 = time.perf_counter()
+    ReplayTransport(store, latency_scale=0.5).roundtrip("chat", _request(), lambda: None)
+    assert 0.09 <= time.perf_counter() - t0 < 0.2
+
+
+def test_chat_json_replays_without_model_secret(tmp_path, monkeypatch):
+    store = CassetteStore(str(tmp_path / "c.sqlite3"))
+    # Recorded where the secret defines the model; not available on replay
+    monkeypatch.setattr(openai_client, "_get_secret", lambda key: {"OPENAI_MODEL": "prod-model"}.get(key))
+
+    class _Resp:
+        class _Choice:
+            class message:
+                content = '{"outfits": [1]}'
+        choices = [_Choice]
+
+    class _Client:
+        class chat:
+            class completions:
+                @staticmethod
+                def create(**kwargs):
+                    assert kwargs["model"] == "prod-model"
+                    return _Resp
+
+    monkeypatch.setattr(openai_client, "_client", lambda: _Client)
+    try:
+        set_transport(RecordTransport(store))
+        assert openai_client.chat_json("sys", "user") == {"outfits": [1]}
+
+        monkeypatch.setattr(openai_client, "_get_secret", lambda key: pytest.fail("replay must not read secrets"))
+        monkeypatch.delenv("OPENAI_MODEL", raising=False)
+        set_transport(ReplayTransport(store))
+        assert openai_client.chat_json("sys", "user") == {"outfits": [1]}
+    finally:
+        set_transport(None)
@@ -0,0 +1,74 @@
+# tests/test_warming.py
+import asyncio
+import json
+import time
+
+from app import prompts
+from app.models.schema import SuggestRequest
+from app.outfit_cache import OutfitCache
+from app.prompts import canonical_request, request_key
+from app.warming import CacheWarmer, RequestLog
+
+
+def _req(occasion: str = "office", temp: float = 61) -> SuggestRequest:
+    return SuggestRequest(occasion=occasion, weather={"temp": temp}, style={}, output={"count": 4})
+
+
+async def _fake_generate(body: SuggestRequest) -> dict:
+    return {"outfits": [{"items": {"top": body.occasion}}]}
+
+
+def test_log_stores_canonical_shapes(tmp_path, monkeypatch):
+    monkeypatch.setattr(prompts, "TEMP_BUCKET_F", 5)
+    log = RequestLog(str(tmp_path / "log.jsonl"))
+    log.append(_req("office", 61))
+    log.append(_req("Office ", 64))
+    log.append(_req("wedding", 75))
+    rec = json.loads((tmp_path / "log.jsonl").read_text().splitlines()[0])
+    assert set(rec) == {"ts", "shape"} and rec["shape"] == canonical_request(_req())
+
+    shapes = log.top_shapes(lookback_s=3600, limit=10)
+    assert [n for _, n in shapes] == [2, 1]
+    assert request_key(shapes[0][0]) == request_key(_req("office", 61))
+
+
+def test_log_rotates(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log = RequestLog(str(path), max_bytes=200)
+    for _ in range(10):
+        log.append(_req())
+    rotated = tmp_path / "log.jsonl.1"
+    assert rotated.exists() and rotated.stat().st_size <= 400
+    assert not path.exists() or path.stat().st_size <= 200
+    # Both generations are mined, older lines beyond that are dropped
+    assert 0 < log.top_shapes(lookback_s=3600, limit=1)[0][1] < 10
+
+
+def test_warm_ttl_reaches_next_window(tmp_path):
+    warmer = CacheWarmer(_fake_generate, OutfitCache(ttl_s=60), RequestLog(str(tmp_path / "log.jsonl")))
+    now = time.time()
+    start = warmer.next_window_start(now)
+    assert now < start <= now + 24 * 3600 + 3600
+    assert warmer.warm_ttl_s(now) > start - now
+
+    key = request_key(_req())
+    assert warmer._needs_refresh(key)
+    warmer.cache.put(key, [{"items": {}}], warmed=True, ttl_s=warmer.warm_ttl_s())
+    assert not warmer._needs_refresh(key)
+    # A plain entry on the short default TTL would lapse before the next window
+    warmer.cache.put(key, [{"items": {}}])
+    assert warmer._needs_refresh(key)
+
+
+def test_cache_failure_does_not_fail_the_pass(tmp_path, monkeypatch):
+    log = RequestLog(str(tmp_path / "log.jsonl"))
+    log.append(_req("office"))
+    log.append(_req("wedding"))
+    warmer = CacheWarmer(_fake_generate, OutfitCache(), log)
+
+    def put(key, outfits, **kwargs):
+        raise TypeError("unhashable type: 'dict'")
+
+    monkeypatch.setattr(warmer.cache, "put", put)
+    report = asyncio.run(warmer.run_once())
+    assert report["failed"] == 2 and report["warmed"] == 0
@@ -1,10 +1,11 @@
 // app/generate/page.tsx
 "use client";
 
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import OutfitCard from "@/app/components/OutfitCard";
 import {
   suggest,
+  prefetch,
   type SuggestRequest,
   type Outfit,
 } from "@/lib/api";
@@ -33,6 +34,7 @@ type FormState = {
 };
 
 const FORM_CACHE_KEY = "form-cache-v2";
+const PREFETCH_DEBOUNCE_MS = 1200;
 const SAVED_OUTFITS_KEY = "saved-outfits-v2";
 const SAVED_PIECES_KEY = "saved-pieces-v2";
 
@@ -124,38 +126,7 @@ export default function GeneratePage() {
     setServerError(null);
     setLoading(true);
 
-    // Build a SuggestRequest for the backend
-    const payload: SuggestRequest = {
-      occasion: form.occasion,
-      season: form.season,
-      weather: {
-        temp: Number(form.weather.temp),
-        rain: form.season === "winter" ? false : Boolean(form.weather.rain),
-        // backend can infer from season + snow flag if needed
-      },
-      style: {
-        vibe: form.style.vibe,
-        fit: form.style.fit,
-        palette: form.style.palette ?? undefined,
-      },
-      special_items: {
-        centerpiece: form.special_items?.centerpiece || undefined,
-        must_include: form.special_items?.must_include || undefined,
-      },
-      constraints: form.constraints,
-      output: form.output,
-      age: form.age ?? undefined,
-      body_type: form.body_type ?? undefined,
-    };
-
-    // if winter & snow toggled on, add a hint into constraints (backend knows)
-    if (form.season === "winter" && form.weather.snow) {
-      payload.constraints = payload.constraints || { avoid: [], budget: null };
-      const avoid = new Set(payload.constraints.avoid || []);
-      // Example: avoid canvas shoes in snow
-      avoid.add("canvas shoes in snow");
-      payload.constraints.avoid = Array.from(avoid);
-    }
+    const payload = buildPayload(form);
 
     try {
       const resp = await suggest(payload);
@@ -213,6 +184,35 @@ export default function GeneratePage() {
     };
   }
 
+  // Build the exact payload onSubmit sends (incl. the winter/snow hint)
+  function buildPayload(f: FormState): SuggestRequest {
+    const payload = toSuggestRequest(f);
+
+    // if winter & snow toggled on, add a hint into constraints (backend knows)
+    if (f.season === "winter" && f.weather.snow) {
+      payload.constraints = { ...(payload.constraints || { avoid: [], budget: null }) };
+      const avoid = new Set(payload.constraints.avoid || []);
+      // Example: avoid canvas shoes in snow
+      avoid.add("canvas shoes in snow");
+      payload.constraints.avoid = Array.from(avoid);
+    }
+    return payload;
+  }
+
+  // Let the backend start generating once the user has edited the form and it
+  // settles; a matching submit attaches to that result instead of starting over.
+  // The restored/default form alone never triggers a speculative generation.
+  const initialForm = useRef(form);
+  useEffect(() => {
+    if (form === initialForm.current) return;
+    if (!form.occasion || !Number.isFinite(form.weather.temp)) return;
+    const t = window.setTimeout(() => {
+      void prefetch(buildPayload(form));
+    }, PREFETCH_DEBOUNCE_MS);
+    return () => window.clearTimeout(t);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [form]);
+
   /* ---------- UI ---------- */
 
   return (
@@ -271,11 +271,15 @@ export default function GeneratePage() {
               type="number"
               min={-10}
               max={120}
-              value={form.weather.temp}
+              value={Number.isFinite(form.weather.temp) ? form.weather.temp : ""}
               onChange={(e) =>
                 setForm({
                   ...form,
-                  weather: { ...form.weather, temp: Number(e.target.value) },
+                  // keep "empty" distinct from 0°F (NaN until the user types a number)
+                  weather: {
+                    ...form.weather,
+                    temp: e.target.value === "" ? NaN : Number(e.target.value),
+                  },
                 })
               }
               required
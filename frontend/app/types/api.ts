@@ -15,7 +15,13 @@ export type SuggestRequest = {
   style: { vibe: StyleVibe; fit: string; palette?: string | null };
   special_items?: { centerpiece?: string | null; must_include?: string | null };
   constraints?: { avoid?: string[]; budget?: number | null };
-  output?: { count: number; include_notes: boolean };
+  output?: {
+    count: number;
+    include_notes: boolean;
+    rank_by_harmony?: boolean;
+    min_harmony?: number | null;
+    fanout?: boolean | null;
+  };
   age?: number | null;
   body_type?: BodyType | null;
 };
@@ -55,6 +61,8 @@ export type Outfit = {
   notes?: string | null;
   fit_notes?: string | null;
   palette?: string[];
+  palette_names?: string[]; // nearest named color per palette entry
+  harmony?: number | null;   // 0..1 palette harmony score
   // items_colors?: Partial<{ top: string; bottom: string; shoes: string; outerwear: string; layer: string; accessories: string }>;
 };
 
@@ -20,7 +20,13 @@ export type SuggestRequest = {
   style: { vibe: StyleVibe; fit: string; palette?: string | null };
   special_items?: { centerpiece?: string | null; must_include?: string | null };
   constraints?: { avoid?: string[]; budget?: number | null };
-  output?: { count: number; include_notes: boolean };
+  output?: {
+    count: number;
+    include_notes: boolean;
+    rank_by_harmony?: boolean;
+    min_harmony?: number | null;
+    fanout?: boolean | null;
+  };
   age?: number | null;
   body_type?: BodyType | null;
 };
@@ -45,6 +51,8 @@ export type Outfit = {
   notes?: string | null;
   fit_notes?: string | null;
   palette?: string[];
+  palette_names?: string[]; // nearest named color per palette entry
+  harmony?: number | null;   // 0..1 palette harmony score
   // optional per-item colors (hex) if backend sends them
   items_colors?: Partial<Record<keyof OutfitItems, string>>;
 };
@@ -89,3 +97,20 @@ export async function suggest(payload: SuggestRequest): Promise<SuggestResponse>
   });
 }
 
+
+
+// ---- Speculative prefetch while the form is being filled ----
+let prefetchSession: string | null = null;
+
+export async function prefetch(payload: Partial<SuggestRequest>): Promise<void> {
+  prefetchSession ??= crypto.randomUUID();
+  try {
+    await fetch(`${API_BASE}/suggest/prefetch`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ ...payload, session_id: prefetchSession }),
+    });
+  } catch {
+    /* best effort: /suggest still works without it */
+  }
+}